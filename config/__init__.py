@@ -6,6 +6,7 @@ from .patterns import (
     LICENSE_REQUIRED_PATTERNS,
     SOURCE_PRIORITY,
     determine_license_need,
+    determine_license_need_series,
 )
 
 __all__ = [
@@ -14,4 +15,5 @@ __all__ = [
     "LICENSE_REQUIRED_PATTERNS",
     "SOURCE_PRIORITY",
     "determine_license_need",
+    "determine_license_need_series",
 ]
@@ -6,6 +6,9 @@
 import re
 from typing import Optional
 
+import numpy as np
+import pandas as pd
+
 # Паттерны, указывающие что лицензия НЕ нужна
 LICENSE_NOT_REQUIRED_PATTERNS = [
     r"не\s+требуется\s+получение\s+лицензии",
@@ -41,15 +44,80 @@ SOURCE_PRIORITY = [
 ]
 
 
-def _check_patterns(text: str, patterns: list[str]) -> bool:
-    """Check if any pattern matches the text."""
-    if not isinstance(text, str) or not text:
-        return False
-    text_lower = text.lower()
+# Версия логики классификации. Увеличивать при любом изменении
+# determine_license_need и сопутствующих функций: от неё зависят ключи
+# кэша вердиктов (utils/classify_cache.py).
+CLASSIFIER_VERSION = 2
+
+
+# Обязательные подстроки паттернов для быстрой предварительной проверки:
+# каждый паттерн списка должен содержать хотя бы одну из них вне
+# необязательных групп. Если в тексте нет ни одной, регулярное выражение
+# не запускается.
+_LICENSE_NOT_REQUIRED_LITERALS = (
+    "лицензи",
+    "разрешени",
+    "возражает",
+    "подлежит",
+    "спис",
+    "контролируем",
+)
+_LICENSE_REQUIRED_LITERALS = (
+    "согласовывает",
+    "заключение",
+    "лицензи",
+    "подлежит",
+    "спис",
+    "контролируем",
+    "разрешени",
+)
+
+# Пробельные символы Unicode, те же, что у \s в re: в тексте из PyPDF2/pdfplumber
+# встречаются узкие и неразрывные пробелы (U+2009, U+202F и др.).
+# Символы записаны в класс как есть, без escape-последовательностей \u,
+# чтобы паттерн понимали и re, и RE2 (PyArrow)
+_WHITESPACE_CLASS = (
+    "[ \t\n\r\f\v\x1c-\x1f\x85\xa0\u1680\u2000-\u200a"
+    "\u2028\u2029\u202f\u205f\u3000]+"
+)
+
+
+def _compile_any(patterns: list[str], literals: tuple[str, ...]) -> re.Pattern:
+    """
+    Combine patterns into a single alternation regex.
+
+    Patterns are lowercase and matched against lowercased text,
+    so no case-insensitive flag is needed. Unicode ``\\s+`` is replaced
+    with an explicit whitespace class.
+
+    Raises:
+        ValueError: If a pattern contains none of the prescan literals
+    """
     for pattern in patterns:
-        if re.search(pattern, text_lower, re.IGNORECASE | re.UNICODE):
-            return True
-    return False
+        if not any(literal in pattern for literal in literals):
+            raise ValueError(f"Pattern has no prescan literal: {pattern!r}")
+    alternatives = [p.replace(r"\s+", _WHITESPACE_CLASS) for p in patterns]
+    return re.compile("|".join(f"(?:{p})" for p in alternatives))
+
+
+# Скомпилированные паттерны: один проход по тексту на каждый список
+_LICENSE_NOT_REQUIRED_RE = _compile_any(
+    LICENSE_NOT_REQUIRED_PATTERNS, _LICENSE_NOT_REQUIRED_LITERALS
+)
+_LICENSE_REQUIRED_RE = _compile_any(
+    LICENSE_REQUIRED_PATTERNS, _LICENSE_REQUIRED_LITERALS
+)
+
+
+def _check_patterns(
+    text_lower: str,
+    pattern: re.Pattern,
+    literals: tuple[str, ...],
+) -> bool:
+    """Check if the combined pattern matches the lowercased text."""
+    if not any(literal in text_lower for literal in literals):
+        return False
+    return pattern.search(text_lower) is not None
 
 
 def determine_license_need(
@@ -75,13 +143,66 @@ def determine_license_need(
         if not isinstance(text, str) or not text:
             continue
 
+        text_lower = text.lower()
+
         # Проверяем паттерны "лицензия нужна"
-        if _check_patterns(text, LICENSE_REQUIRED_PATTERNS):
+        if _check_patterns(
+            text_lower, _LICENSE_REQUIRED_RE, _LICENSE_REQUIRED_LITERALS
+        ):
             return True
 
         # Проверяем паттерны "лицензия не нужна"
-        if _check_patterns(text, LICENSE_NOT_REQUIRED_PATTERNS):
+        if _check_patterns(
+            text_lower, _LICENSE_NOT_REQUIRED_RE, _LICENSE_NOT_REQUIRED_LITERALS
+        ):
             return False
 
     # Не удалось определить
     return None
+
+
+_ARROW_STRING = pd.StringDtype("pyarrow")
+
+
+def determine_license_need_series(
+    permit_texts: pd.Series,
+    license_texts: pd.Series,
+) -> pd.Series:
+    """
+    Векторизованная версия determine_license_need для столбцов DataFrame.
+
+    Args:
+        permit_texts: Тексты из документов permit/
+        license_texts: Тексты из документов license/ (тот же индекс)
+
+    Returns:
+        Series с True / False / None для каждой строки
+    """
+    sources = {"license_text": license_texts, "permit_text": permit_texts}
+    result = np.full(len(permit_texts), None, dtype=object)
+    undecided = np.ones(len(permit_texts), dtype=bool)
+    # Проверки идут в порядке приоритета источников; каждая следующая
+    # выполняется только для строк, которые ещё не определены
+    for source_name in SOURCE_PRIORITY:
+        # Строки Arrow: lower() и contains() выполняются в PyArrow, а паттерны
+        # проверяет RE2 (DFA, линейное время без возвратов)
+        texts = sources[source_name].astype(_ARROW_STRING)
+        rows = np.flatnonzero(undecided & texts.notna().to_numpy())
+        if not len(rows):
+            continue
+        text_lower = texts.iloc[rows].str.lower()
+
+        required = text_lower.str.contains(
+            _LICENSE_REQUIRED_RE.pattern, regex=True, na=False
+        ).to_numpy(dtype=bool)
+        result[rows[required]] = True
+        undecided[rows[required]] = False
+
+        rest = ~required
+        not_required = text_lower[rest].str.contains(
+            _LICENSE_NOT_REQUIRED_RE.pattern, regex=True, na=False
+        ).to_numpy(dtype=bool)
+        result[rows[rest][not_required]] = False
+        undecided[rows[rest][not_required]] = False
+
+    return pd.Series(result, index=permit_texts.index, dtype=object)
@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DatabaseSettings:
     """PostgreSQL database settings."""
     host: str = field(default_factory=lambda: os.getenv("DB_HOST", "localhost"))
@@ -22,7 +22,7 @@ class DatabaseSettings:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MinIOSettings:
     """MinIO storage settings."""
     endpoint: str = field(default_factory=lambda: os.getenv("MINIO_ENDPOINT", "minio.example.com:9000"))
@@ -30,9 +30,14 @@ class MinIOSettings:
     secret_key: str = field(default_factory=lambda: os.getenv("MINIO_SECRET_KEY", "secret_key"))
     bucket: str = field(default_factory=lambda: os.getenv("MINIO_BUCKET", "documents"))
     secure: bool = field(default_factory=lambda: os.getenv("MINIO_SECURE", "true").lower() == "true")
+    max_workers: int = field(default_factory=lambda: int(os.getenv("MINIO_MAX_WORKERS", "32")))
+    # Size limit of the local download cache; 0 (default) disables it
+    cache_max_bytes: int = field(default_factory=lambda: int(os.getenv("MINIO_CACHE_MAX_BYTES", "0")))
+    # How long step 1 reuses a saved directory listing; 0 (default) disables it
+    listing_ttl_seconds: int = field(default_factory=lambda: int(os.getenv("MINIO_LISTING_TTL_SECONDS", "0")))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OCRSettings:
     """OCR API settings."""
     api_url: str = field(default_factory=lambda: os.getenv("OCR_API_URL", "http://192.168.250.44:8088"))
@@ -42,20 +47,16 @@ class OCRSettings:
     timeout: int = field(default_factory=lambda: int(os.getenv("OCR_TIMEOUT", "300")))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PathSettings:
     """File path settings."""
     output_dir: Path = field(default_factory=lambda: Path(os.getenv("OUTPUT_DIR", "./output")))
     state_dir: Path = field(default_factory=lambda: Path(os.getenv("STATE_DIR", "./state")))
     logs_dir: Path = field(default_factory=lambda: Path(os.getenv("LOGS_DIR", "./logs")))
+    cache_dir: Path = field(default_factory=lambda: Path(os.getenv("CACHE_DIR", "./cache")))
 
-    def __post_init__(self):
-        self.output_dir = Path(self.output_dir)
-        self.state_dir = Path(self.state_dir)
-        self.logs_dir = Path(self.logs_dir)
 
-
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Settings:
     """Main settings container."""
     database: DatabaseSettings = field(default_factory=DatabaseSettings)
@@ -64,6 +65,10 @@ class Settings:
     paths: PathSettings = field(default_factory=PathSettings)
 
     batch_size: int = field(default_factory=lambda: int(os.getenv("BATCH_SIZE", "100")))
+    # Progress bars are also hidden when stdout is not a terminal
+    show_progress: bool = field(
+        default_factory=lambda: os.getenv("NO_PROGRESS", "").lower() not in ("1", "true", "yes")
+    )
 
 
 settings = Settings()
@@ -7,6 +7,9 @@ from sqlalchemy.engine import Engine
 
 from config.settings import settings
 
+# Rows per round-trip when reading through a server-side cursor
+_FETCH_SIZE = 10_000
+
 
 class Database:
     """PostgreSQL database client."""
@@ -18,7 +21,13 @@ class Database:
     @property
     def engine(self) -> Engine:
         if self._engine is None:
-            self._engine = create_engine(self._connection_string)
+            self._engine = create_engine(
+                self._connection_string,
+                pool_size=20,
+                max_overflow=10,
+                pool_pre_ping=True,
+                pool_recycle=1800,
+            )
         return self._engine
 
     def connect(self) -> None:
@@ -40,6 +49,33 @@ class Database:
         except Exception:
             return False
 
+    def _read_query(self, query: str) -> pd.DataFrame:
+        """
+        Execute query on a raw DBAPI cursor and build a DataFrame.
+
+        Bypasses SQLAlchemy row processing used by pd.read_sql.
+        Uses a server-side (named) cursor so the result set is fetched
+        in batches instead of being buffered by the driver at once.
+        """
+        conn = self.engine.raw_connection()
+        try:
+            cursor = conn.cursor(name="read_query")
+            try:
+                cursor.execute(query)
+                rows = []
+                while True:
+                    batch = cursor.fetchmany(_FETCH_SIZE)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+                # Named cursors have a description only after the first fetch
+                columns = [col[0] for col in cursor.description]
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
     def get_base_dataset(self) -> pd.DataFrame:
         """
         Get base dataset from saf and saf_product_index tables.
@@ -57,7 +93,7 @@ class Database:
             LEFT JOIN saf s ON p.saf_number = s.saf_number
             ORDER BY p.saf_number, p.id
         """
-        return pd.read_sql(query, self.engine)
+        return self._read_query(query)
 
     def get_document_mapping(self) -> pd.DataFrame:
         """
@@ -76,13 +112,14 @@ class Database:
             WHERE document_file_new IS NOT NULL
             ORDER BY saf_number, id
         """
-        return pd.read_sql(query, self.engine)
+        return self._read_query(query)
 
     def get_unique_saf_numbers(self) -> list[str]:
         """Get list of unique SAF numbers."""
-        query = "SELECT DISTINCT saf_number FROM saf_product_index ORDER BY saf_number"
-        df = pd.read_sql(query, self.engine)
-        return df["saf_number"].tolist()
+        query = text("SELECT DISTINCT saf_number FROM saf_product_index ORDER BY saf_number")
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(query)
+            return list(result.scalars())
 
     def __enter__(self):
         self.connect()
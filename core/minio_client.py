@@ -1,12 +1,17 @@
 """MinIO (S3-compatible) storage client."""
 
-import io
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
+import certifi
+import urllib3
 from minio import Minio
 from minio.error import S3Error
+from urllib3.response import BaseHTTPResponse
 
 from config.settings import settings
+from utils.download_cache import DownloadCache
 
 
 class MinIOClient:
@@ -19,22 +24,46 @@ class MinIOClient:
         secret_key: Optional[str] = None,
         bucket: Optional[str] = None,
         secure: Optional[bool] = None,
+        max_workers: Optional[int] = None,
     ):
         self._endpoint = endpoint or settings.minio.endpoint
         self._access_key = access_key or settings.minio.access_key
         self._secret_key = secret_key or settings.minio.secret_key
         self._bucket = bucket or settings.minio.bucket
         self._secure = secure if secure is not None else settings.minio.secure
+        self._max_workers = max_workers or settings.minio.max_workers
         self._client: Optional[Minio] = None
+        # Listing caches: prefix -> object names, directory -> SAF numbers
+        self._prefix_cache: dict[str, list[str]] = {}
+        self._saf_dir_cache: dict[str, set[str]] = {}
+        self._files_by_saf_cache: dict[str, dict[str, list[str]]] = {}
+        # ETags seen in listings, so cached downloads need no stat request
+        self._etags: dict[str, str] = {}
+        self._download_cache = DownloadCache()
 
     @property
     def client(self) -> Minio:
         if self._client is None:
+            # Same settings as the Minio default client, but with the connection
+            # pool sized for concurrent listings/downloads from worker threads
+            timeout = 300
+            http_client = urllib3.PoolManager(
+                timeout=urllib3.Timeout(connect=timeout, read=timeout),
+                maxsize=max(10, self._max_workers),
+                cert_reqs="CERT_REQUIRED",
+                ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+                retries=urllib3.Retry(
+                    total=5,
+                    backoff_factor=0.2,
+                    status_forcelist=[500, 502, 503, 504],
+                ),
+            )
             self._client = Minio(
                 self._endpoint,
                 access_key=self._access_key,
                 secret_key=self._secret_key,
                 secure=self._secure,
+                http_client=http_client,
             )
         return self._client
 
@@ -56,11 +85,22 @@ class MinIOClient:
         Returns:
             List of file paths
         """
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return list(cached)
         try:
             objects = self.client.list_objects(self._bucket, prefix=prefix, recursive=True)
-            return [obj.object_name for obj in objects if not obj.is_dir]
+            files = []
+            for obj in objects:
+                if obj.is_dir:
+                    continue
+                files.append(obj.object_name)
+                if obj.etag:
+                    self._etags[obj.object_name] = obj.etag
         except S3Error:
             return []
+        self._prefix_cache[prefix] = files
+        return list(files)
 
     def get_files_for_saf(self, saf_number: str, directory: str) -> list[str]:
         """
@@ -78,7 +118,7 @@ class MinIOClient:
 
     def download_file(self, object_name: str) -> bytes:
         """
-        Download file from MinIO.
+        Download file from MinIO, going through the local download cache.
 
         Args:
             object_name: Full object path in bucket
@@ -86,9 +126,30 @@ class MinIOClient:
         Returns:
             File contents as bytes
         """
+        if not self._download_cache.enabled:
+            return self._read_object(object_name)[0]
+
+        etag = self._etags.get(object_name)
+        if etag is None:
+            etag = self.client.stat_object(self._bucket, object_name).etag
+        if etag:
+            data = self._download_cache.get(self._bucket, object_name, etag)
+            if data is not None:
+                return data
+
+        data, etag = self._read_object(object_name)
+        if etag:
+            # Keyed by the ETag of what was actually read, in case the object just changed
+            self._download_cache.put(self._bucket, object_name, etag, data)
+            self._etags[object_name] = etag
+        return data
+
+    def _read_object(self, object_name: str) -> tuple[bytes, Optional[str]]:
+        """Read object contents and the ETag they came with."""
         response = self.client.get_object(self._bucket, object_name)
         try:
-            return response.read()
+            etag = response.headers.get("ETag")
+            return response.read(), etag.strip('"') if etag else None
         finally:
             response.close()
             response.release_conn()
@@ -103,18 +164,20 @@ class MinIOClient:
         """
         self.client.fget_object(self._bucket, object_name, str(local_path))
 
-    def get_file_stream(self, object_name: str) -> io.BytesIO:
+    def get_file_stream(self, object_name: str) -> BaseHTTPResponse:
         """
-        Get file as BytesIO stream.
+        Get file as a streaming file-like object without buffering it in memory.
+
+        The caller must call close() and release_conn() on the returned
+        response when done, to return the connection to the pool.
 
         Args:
             object_name: Full object path in bucket
 
         Returns:
-            BytesIO stream with file contents
+            HTTP response readable via read() or stream(chunk_size)
         """
-        data = self.download_file(object_name)
-        return io.BytesIO(data)
+        return self.client.get_object(self._bucket, object_name)
 
     def file_exists(self, object_name: str) -> bool:
         """Check if file exists in MinIO."""
@@ -134,6 +197,9 @@ class MinIOClient:
         Returns:
             Set of SAF numbers
         """
+        cached = self._saf_dir_cache.get(directory)
+        if cached is not None:
+            return set(cached)
         prefix = f"{directory}/"
         saf_numbers = set()
         try:
@@ -144,5 +210,64 @@ class MinIOClient:
                     saf_number = obj.object_name.rstrip("/").split("/")[-1]
                     saf_numbers.add(saf_number)
         except S3Error:
-            pass
-        return saf_numbers
+            return saf_numbers
+        self._saf_dir_cache[directory] = saf_numbers
+        return set(saf_numbers)
+
+    def get_files_by_saf(self, directory: str) -> dict[str, list[str]]:
+        """
+        Get files of all SAF numbers in a directory with a single recursive listing.
+
+        Also fills the per-prefix listing cache, so later get_files_for_saf
+        calls for these SAF numbers need no requests.
+
+        Args:
+            directory: Directory name (specs, permit, license)
+
+        Returns:
+            Mapping of SAF number to list of file paths
+        """
+        cached = self._files_by_saf_cache.get(directory)
+        if cached is not None:
+            return {saf: list(files) for saf, files in cached.items()}
+        files_by_saf: dict[str, list[str]] = {}
+        try:
+            objects = self.client.list_objects(
+                self._bucket, prefix=f"{directory}/", recursive=True
+            )
+            for obj in objects:
+                if obj.is_dir:
+                    continue
+                # Path like "specs/2024-00001/file.pdf"
+                parts = obj.object_name.split("/", 2)
+                if len(parts) < 3:
+                    continue
+                files_by_saf.setdefault(parts[1], []).append(obj.object_name)
+                if obj.etag:
+                    self._etags[obj.object_name] = obj.etag
+        except S3Error:
+            return {}
+        self._files_by_saf_cache[directory] = files_by_saf
+        for saf_number, files in files_by_saf.items():
+            self._prefix_cache[f"{directory}/{saf_number}/"] = files
+        return {saf: list(files) for saf, files in files_by_saf.items()}
+
+    def get_all_saf_numbers_with_files_multi(
+        self,
+        directories: list[str],
+    ) -> dict[str, set[str]]:
+        """
+        Get SAF numbers with files for several directories, listing them concurrently.
+
+        Args:
+            directories: Directory names (specs, permit, license)
+
+        Returns:
+            Mapping of directory to set of SAF numbers
+        """
+        if not directories:
+            return {}
+        _ = self.client
+        with ThreadPoolExecutor(max_workers=min(len(directories), self._max_workers)) as executor:
+            results = executor.map(self.get_all_saf_numbers_with_files, directories)
+            return dict(zip(directories, results))
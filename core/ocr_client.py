@@ -7,6 +7,11 @@ import httpx
 from config.settings import settings
 from utils.retry import retry_async
 
+# Retry policy for OCR submissions (network errors and 5xx responses)
+_RETRY_ATTEMPTS = 3
+_RETRY_DELAY = 5
+_RETRY_BACKOFF = 2
+
 
 class OCRError(Exception):
     """OCR API error."""
@@ -18,6 +23,11 @@ class OCRTimeoutError(OCRError):
     pass
 
 
+def _is_client_error(error: Exception) -> bool:
+    """Client errors (4xx) will not succeed on retry."""
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500
+
+
 class OCRClient:
     """OCR API client with async support."""
 
@@ -28,17 +38,57 @@ class OCRClient:
     ):
         self._api_url = (api_url or settings.ocr.api_url).rstrip("/")
         self._timeout = timeout or settings.ocr.timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared async HTTP client with connection pooling.
+
+        Connections are bound to the event loop, so a new client is created
+        if the running loop differs from the one the client was created in.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+    async def __aenter__(self):
+        _ = self.client
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
 
     def test_connection(self) -> bool:
-        """Test if OCR API is accessible."""
+        """
+        Test if OCR API is accessible.
+
+        Sends a HEAD probe on a short-lived sync client: the shared async
+        client is bound to its event loop and cannot be reused from sync code.
+        Any response below 500 means the server is up (GET-only routes answer
+        HEAD with 405).
+        """
         try:
             with httpx.Client(timeout=10) as client:
-                response = client.get(f"{self._api_url}/")
-                return response.status_code in (200, 404)
+                response = client.head(f"{self._api_url}/")
+                return response.status_code < 500
         except Exception:
             return False
 
-    @retry_async(max_attempts=3, delay=5, backoff=2, exceptions=(httpx.TimeoutException, httpx.ConnectError))
     async def process_file(self, file_data: bytes, filename: str = "document.pdf") -> str:
         """
         Submit file to OCR API and return extracted text.
@@ -50,21 +100,31 @@ class OCRClient:
         Returns:
             Extracted text from data.text field
         """
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            files = {"file": (filename, file_data, "application/pdf")}
-            response = await client.post(
-                f"{self._api_url}/ocr/process",
-                files=files,
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            status = result.get("status", "").lower()
-            if status == "completed":
-                return result.get("data", {}).get("text", "")
-
-            error = result.get("error")
-            raise OCRError(f"OCR failed with status '{status}': {error}")
+        response = await self._submit(
+            {"file": (filename, file_data, "application/pdf")}
+        )
+        result = response.json()
+
+        status = result.get("status", "").lower()
+        if status == "completed":
+            return result.get("data", {}).get("text", "")
+
+        error = result.get("error")
+        raise OCRError(f"OCR failed with status '{status}': {error}")
+
+    @retry_async(
+        max_attempts=_RETRY_ATTEMPTS,
+        delay=_RETRY_DELAY,
+        backoff=_RETRY_BACKOFF,
+        exceptions=(httpx.TimeoutException, httpx.ConnectError, httpx.HTTPStatusError),
+        giveup=_is_client_error,
+        jitter=True,
+    )
+    async def _submit(self, files: dict) -> httpx.Response:
+        """Post a file to the OCR endpoint, retrying network errors and 5xx responses."""
+        response = await self.client.post(f"{self._api_url}/ocr/process", files=files)
+        response.raise_for_status()
+        return response
 
     def process_file_sync(self, file_data: bytes, filename: str = "document.pdf") -> str:
         """
@@ -77,4 +137,8 @@ class OCRClient:
         Returns:
             Extracted text
         """
-        return asyncio.run(self.process_file(file_data, filename))
+        async def _run() -> str:
+            async with self:
+                return await self.process_file(file_data, filename)
+
+        return asyncio.run(_run())
@@ -3,61 +3,73 @@ Diagnostic script to identify where SAF numbers are lost
 between PostgreSQL and MinIO in the pipeline.
 """
 
-import json
 from pathlib import Path
 from collections import Counter
+from heapq import nsmallest
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from sqlalchemy import create_engine, text
 from config.settings import settings
 from core.minio_client import MinIOClient
+from utils.json_file import read_json
+from utils.progress import StateManager
 
 
 def get_db_saf_numbers(engine):
     """Get SAF numbers from different DB tables/queries."""
 
-    # 1. All SAF numbers in saf_product_index
-    q1 = "SELECT DISTINCT saf_number FROM saf_product_index"
-    with engine.connect() as conn:
-        saf_product = {row[0] for row in conn.execute(text(q1))}
-
-    # 2. All SAF numbers in saf
-    q2 = "SELECT DISTINCT saf_number FROM saf"
-    with engine.connect() as conn:
-        saf_main = {row[0] for row in conn.execute(text(q2))}
-
-    # 3. Result of the JOIN (what Step 1 actually uses)
-    q3 = """
-        SELECT DISTINCT p.saf_number
-        FROM saf_product_index p
-        JOIN saf s ON p.saf_number = s.saf_number
+    # One pass over both tables: for each SAF number, which table(s) contain it
+    query = """
+        SELECT
+            saf_number,
+            bool_or(src = 'p') AS in_product,
+            bool_or(src = 's') AS in_saf
+        FROM (
+            SELECT saf_number, 'p' AS src FROM saf_product_index
+            UNION ALL
+            SELECT saf_number, 's' AS src FROM saf
+        ) u
+        GROUP BY saf_number
     """
+    saf_product = set()   # 1. All SAF numbers in saf_product_index
+    saf_main = set()      # 2. All SAF numbers in saf
+    saf_joined = set()    # 3. Result of the JOIN (what Step 1 actually uses)
     with engine.connect() as conn:
-        saf_joined = {row[0] for row in conn.execute(text(q3))}
+        for saf_number, in_product, in_saf in conn.execute(text(query)):
+            if in_product:
+                saf_product.add(saf_number)
+            if in_saf:
+                saf_main.add(saf_number)
+            if in_product and in_saf:
+                saf_joined.add(saf_number)
 
     return saf_product, saf_main, saf_joined
 
 
 def get_minio_saf_numbers(minio: MinIOClient):
     """Get SAF numbers from MinIO directories."""
-    specs = minio.get_all_saf_numbers_with_files("specs")
-    permit = minio.get_all_saf_numbers_with_files("permit")
-    license_ = minio.get_all_saf_numbers_with_files("license")
-    return specs, permit, license_
+    by_directory = minio.get_all_saf_numbers_with_files_multi(["specs", "permit", "license"])
+    return by_directory["specs"], by_directory["permit"], by_directory["license"]
+
+
+def _normalize_saf(s: str) -> str:
+    """Normalize SAF number for comparison: strip whitespace, lowercase."""
+    return s.strip().lower()
 
 
 def check_format_mismatches(db_safs: set, minio_safs: set, label: str):
     """Check if SAF number format differences cause mismatches."""
     # Normalize: strip, lower, remove leading/trailing whitespace
-    db_normalized = {s.strip().lower(): s for s in db_safs}
-    minio_normalized = {s.strip().lower(): s for s in minio_safs}
+    db_normalized = {_normalize_saf(s): s for s in db_safs}
 
     # Find cases where normalized form matches but original doesn't
     mismatches = []
-    for norm_key, minio_orig in minio_normalized.items():
-        if norm_key in db_normalized:
-            db_orig = db_normalized[norm_key]
-            if db_orig != minio_orig:
-                mismatches.append((db_orig, minio_orig))
+    for minio_orig in minio_safs:
+        db_orig = db_normalized.get(_normalize_saf(minio_orig))
+        if db_orig is not None and db_orig != minio_orig:
+            mismatches.append((db_orig, minio_orig))
 
     if mismatches:
         print(f"\n  !! FORMAT MISMATCHES ({label}): {len(mismatches)} found")
@@ -73,8 +85,7 @@ def load_existing_mapping(state_dir: Path):
     """Load document_mapping.json if exists."""
     mapping_path = state_dir / "document_mapping.json"
     if mapping_path.exists():
-        with open(mapping_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_json(mapping_path)
     return None
 
 
@@ -104,7 +115,7 @@ def main():
     lost_in_join = saf_product - saf_main
     print(f"\n  SAF numbers in saf_product_index but NOT in saf table: {len(lost_in_join):,}")
     if lost_in_join:
-        examples = sorted(lost_in_join)[:10]
+        examples = nsmallest(10, lost_in_join)
         print(f"  Examples: {examples}")
 
     # --- MinIO ---
@@ -139,7 +150,7 @@ def main():
     print(f"  In MinIO only (not in DB):                    {len(in_minio_only):,}")
 
     if in_minio_only:
-        examples = sorted(in_minio_only)[:15]
+        examples = nsmallest(15, in_minio_only)
         print(f"\n  Examples of MinIO-only SAF numbers:")
         for s in examples:
             print(f"    '{s}'")
@@ -154,7 +165,7 @@ def main():
     if in_product_not_saf:
         print(f"\n  SAF numbers in saf_product_index AND MinIO specs,")
         print(f"  but lost due to JOIN with saf table: {len(in_product_not_saf):,}")
-        examples = sorted(in_product_not_saf)[:10]
+        examples = nsmallest(10, in_product_not_saf)
         print(f"  Examples: {examples}")
 
     # --- Existing mapping check ---
@@ -173,7 +184,7 @@ def main():
         diff = in_both - specs_mapped
         if diff:
             print(f"\n  SAF numbers in intersection but MISSING from mapping: {len(diff):,}")
-            examples = sorted(diff)[:10]
+            examples = nsmallest(10, diff)
             print(f"  Examples: {examples}")
         else:
             print(f"\n  Mapping is consistent with DB/MinIO intersection")
@@ -184,32 +195,40 @@ def main():
     print(f"\n[8] Checking Step 2 output...")
     step2_path = settings.paths.output_dir / "step2_tech_specs.parquet"
     if step2_path.exists():
-        import pandas as pd
-        df_step2 = pd.read_parquet(step2_path)
-        step2_safs = set(df_step2["saf_number"].unique())
-        print(f"  Records in step2_tech_specs.parquet: {len(df_step2):,}")
-        print(f"  Unique SAF numbers:                  {len(step2_safs):,}")
+        # Read only the columns used below; aggregate in Arrow
+        step2_columns = [
+            c for c in ("saf_number", "tech_description", "tech_ocr_errors")
+            if c in pq.read_schema(step2_path).names
+        ]
+        table_step2 = pq.read_table(step2_path, columns=step2_columns)
+        # A null saf_number counts as one more distinct value
+        step2_unique = pc.count_distinct(table_step2["saf_number"], mode="all").as_py()
+        print(f"  Records in step2_tech_specs.parquet: {table_step2.num_rows:,}")
+        print(f"  Unique SAF numbers:                  {step2_unique:,}")
 
         # Check for empty tech descriptions
-        empty_desc = df_step2["tech_description"].isna().sum()
-        empty_desc += (df_step2["tech_description"] == "").sum()
+        tech_desc = table_step2["tech_description"]
+        empty_mask = pc.or_kleene(pc.is_null(tech_desc), pc.equal(tech_desc, ""))
+        empty_desc = pc.sum(empty_mask).as_py() or 0
         print(f"  Empty/null tech_description:         {empty_desc:,}")
 
         # Check errors
-        if "tech_ocr_errors" in df_step2.columns:
-            has_errors = df_step2["tech_ocr_errors"].apply(
-                lambda x: bool(x) if isinstance(x, list) else False
-            ).sum()
+        if "tech_ocr_errors" in step2_columns:
+            errors_col = table_step2["tech_ocr_errors"]
+            has_errors = 0
+            if pa.types.is_list(errors_col.type):
+                non_empty = pc.greater(pc.list_value_length(errors_col), 0)
+                has_errors = pc.sum(non_empty).as_py() or 0
             print(f"  Records with OCR errors:             {has_errors:,}")
     else:
         print("  step2_tech_specs.parquet not found")
 
     # --- State file check ---
     print(f"\n[9] Checking Step 2 state...")
-    state_path = settings.paths.state_dir / "step2_tech_specs_progress.json"
-    if state_path.exists():
-        with open(state_path, "r", encoding="utf-8") as f:
-            state = json.load(f)
+    state_manager = StateManager("step2_tech_specs")
+    if state_manager.exists():
+        # Snapshot plus replayed delta log
+        state = state_manager.load()
         print(f"  Total items:     {state.get('total_items', '?')}")
         print(f"  Processed items: {state.get('processed_items', '?')}")
         print(f"  Failed items:    {state.get('failed_items', '?')}")
@@ -217,7 +236,10 @@ def main():
         if failed:
             print(f"  Failed SAF numbers: {len(failed):,}")
             # Show error distribution
-            error_types = Counter(str(v)[:80] for v in failed.values())
+            error_types = Counter()
+            for v in failed.values():
+                # Most messages are already short strings: skip str() and slicing
+                error_types[v if isinstance(v, str) and len(v) <= 80 else str(v)[:80]] += 1
             print(f"  Error distribution:")
             for err, cnt in error_types.most_common(5):
                 print(f"    [{cnt}x] {err}")
@@ -228,12 +250,13 @@ def main():
     print(f"\n[10] Checking final dataset...")
     final_path = settings.paths.output_dir / "final_dataset.parquet"
     if final_path.exists():
-        import pandas as pd
-        df_final = pd.read_parquet(final_path)
-        print(f"  Total records:                       {len(df_final):,}")
-        print(f"  Unique SAF numbers:                  {df_final['saf_number'].nunique():,}")
-        has_tech = df_final["tech_description"].notna().sum()
-        no_tech = df_final["tech_description"].isna().sum()
+        table_final = pq.read_table(final_path, columns=["saf_number", "tech_description"])
+        # Nulls are not counted, as with pandas nunique()
+        final_unique = pc.count_distinct(table_final["saf_number"], mode="only_valid").as_py()
+        print(f"  Total records:                       {table_final.num_rows:,}")
+        print(f"  Unique SAF numbers:                  {final_unique:,}")
+        no_tech = table_final["tech_description"].null_count
+        has_tech = table_final.num_rows - no_tech
         print(f"  With tech_description:               {has_tech:,}")
         print(f"  Without tech_description (null):     {no_tech:,}")
     else:
@@ -258,13 +281,13 @@ def main():
         print(f"    Current:   {len(in_both):,}")
         print(f"    Potential: {potential_total:,}  (+{len(minio_only_in_product):,})")
 
-        examples = sorted(minio_only_in_product)[:15]
+        examples = nsmallest(15, minio_only_in_product)
         print(f"\n  Examples of recoverable SAF numbers:")
         for s in examples:
             print(f"    '{s}'")
 
     if minio_only_nowhere:
-        examples = sorted(minio_only_nowhere)[:15]
+        examples = nsmallest(15, minio_only_nowhere)
         print(f"\n  Examples of SAF numbers in MinIO but not in any DB table:")
         for s in examples:
             print(f"    '{s}'")
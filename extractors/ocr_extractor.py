@@ -1,6 +1,7 @@
 """OCR-based text extraction for scanned documents."""
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from core.minio_client import MinIOClient
@@ -21,6 +22,7 @@ class OCRExtractor:
         self._ocr = ocr_client or OCRClient()
         self._max_concurrent = max_concurrent or settings.ocr.max_concurrent
         self._semaphore: Optional[asyncio.Semaphore] = None
+        self._download_pool: Optional[ThreadPoolExecutor] = None
 
     @property
     def semaphore(self) -> asyncio.Semaphore:
@@ -28,32 +30,63 @@ class OCRExtractor:
             self._semaphore = asyncio.Semaphore(self._max_concurrent)
         return self._semaphore
 
+    @property
+    def download_pool(self) -> ThreadPoolExecutor:
+        """Threads for blocking MinIO downloads, so they overlap with OCR requests."""
+        if self._download_pool is None:
+            self._download_pool = ThreadPoolExecutor(max_workers=self._max_concurrent)
+        return self._download_pool
+
+    def run(self, coro):
+        """Run a coroutine in a new event loop, closing the OCR HTTP client before it ends."""
+        async def _main():
+            try:
+                return await coro
+            finally:
+                await self._ocr.aclose()
+                self._semaphore = None
+
+        return asyncio.run(_main())
+
+    def close(self) -> None:
+        """Shut down the download pool."""
+        if self._download_pool is not None:
+            self._download_pool.shutdown(wait=False)
+            self._download_pool = None
+
     async def process_file(self, object_name: str) -> tuple[str, Optional[str]]:
         """
         Process single file through OCR.
 
+        The download runs before an OCR slot is taken, so OCR requests
+        are not held up by MinIO and files of other SAF numbers can be
+        fetched while OCR is busy.
+
         Args:
             object_name: MinIO object path
 
         Returns:
             Tuple of (extracted_text, error_message)
         """
-        async with self.semaphore:
-            try:
-                file_data = self._minio.download_file(object_name)
-                filename = object_name.split("/")[-1]
+        try:
+            file_data = await asyncio.get_running_loop().run_in_executor(
+                self.download_pool, self._minio.download_file, object_name
+            )
+            filename = object_name.split("/")[-1]
+            async with self.semaphore:
                 text = await self._ocr.process_file(file_data, filename)
-                return text, None
-            except (OCRError, OCRTimeoutError) as e:
-                return "", str(e)
-            except Exception as e:
-                return "", f"Unexpected error: {e}"
+            return text, None
+        except (OCRError, OCRTimeoutError) as e:
+            return "", str(e)
+        except Exception as e:
+            return "", f"Unexpected error: {e}"
 
     async def process_saf_files(
         self,
         saf_number: str,
         directory: str = "specs",
         separator: str = "\n\n---\n\n",
+        files: Optional[list[str]] = None,
     ) -> tuple[str, list[str], list[str]]:
         """
         Process all files for a SAF number through OCR.
@@ -62,11 +95,17 @@ class OCRExtractor:
             saf_number: SAF number
             directory: MinIO directory (specs, permit, license)
             separator: Text separator between files
+            files: File paths, e.g. from the document mapping; listed
+                from MinIO if not given
 
         Returns:
             Tuple of (combined_text, processed_files, errors)
         """
-        files = self._minio.get_files_for_saf(saf_number, directory)
+        if files is None:
+            # Listing is blocking I/O; keep it off the event loop
+            files = await asyncio.get_running_loop().run_in_executor(
+                self.download_pool, self._minio.get_files_for_saf, saf_number, directory
+            )
 
         if not files:
             return "", [], None
@@ -109,4 +148,4 @@ class OCRExtractor:
         Returns:
             Tuple of (combined_text, processed_files, errors)
         """
-        return asyncio.run(self.process_saf_files(saf_number, directory, separator))
+        return self.run(self.process_saf_files(saf_number, directory, separator))
@@ -1,41 +1,119 @@
 """PDF text extraction using PyPDF2 and pdfplumber."""
 
+import atexit
 import io
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Optional
 import PyPDF2
 import pdfplumber
 
+# Batches smaller than this are extracted in-process
+_PARALLEL_MIN_FILES = 4
+
+# PyPDF2 result is accepted in "auto" mode above this many characters per page
+_MIN_CHARS_PER_PAGE = 100
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
 
 class PDFExtractionError(Exception):
     """Error during PDF text extraction."""
     pass
 
 
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Get shared process pool for CPU-bound PDF parsing (created on first use)."""
+    global _process_pool
+    if _process_pool is None:
+        # Workers start from a clean interpreter instead of forking a parent
+        # that already holds thread pools and network connections
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context(method),
+        )
+    return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next _get_process_pool call creates a new one."""
+    global _process_pool
+    if _process_pool is pool:
+        _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _shutdown_process_pool() -> None:
+    """Stop worker processes on interpreter exit."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+
+def _submit(item: tuple[str, bytes]) -> Future:
+    """Submit one item to the pool, replacing the pool once if it is broken."""
+    pool = _get_process_pool()
+    try:
+        return pool.submit(_extract_one, item)
+    except BrokenProcessPool:
+        _discard_process_pool(pool)
+        return _get_process_pool().submit(_extract_one, item)
+
+
+def _extract_one(item: tuple[str, bytes]) -> tuple[str, Optional[str]]:
+    """Extract text from one (filename, file_data) item; picklable for worker processes."""
+    _, file_data = item
+    try:
+        return PDFExtractor.extract(file_data), None
+    except PDFExtractionError as e:
+        return "", str(e)
+
+
 class PDFExtractor:
     """Extract text from machine-readable PDFs."""
 
     @staticmethod
-    def extract_with_pypdf2(file_data: bytes) -> str:
+    def _extract_with_pypdf2_pages(file_data: bytes) -> tuple[str, int]:
         """
-        Extract text using PyPDF2.
+        Extract text using PyPDF2 along with the page count.
 
         Args:
             file_data: PDF file contents as bytes
 
         Returns:
-            Extracted text
+            Tuple of (extracted_text, page_count)
         """
         try:
             reader = PyPDF2.PdfReader(io.BytesIO(file_data))
+            pages = reader.pages
             text_parts = []
-            for page in reader.pages:
+            for page in pages:
                 page_text = page.extract_text()
                 if page_text:
                     text_parts.append(page_text)
-            return "\n\n".join(text_parts)
+            return "\n\n".join(text_parts), len(pages)
         except Exception as e:
             raise PDFExtractionError(f"PyPDF2 extraction failed: {e}") from e
 
+    @classmethod
+    def extract_with_pypdf2(cls, file_data: bytes) -> str:
+        """
+        Extract text using PyPDF2.
+
+        Args:
+            file_data: PDF file contents as bytes
+
+        Returns:
+            Extracted text
+        """
+        text, _ = cls._extract_with_pypdf2_pages(file_data)
+        return text
+
     @staticmethod
     def extract_with_pdfplumber(file_data: bytes) -> str:
         """
@@ -75,23 +153,105 @@ class PDFExtractor:
         elif method == "pdfplumber":
             return cls.extract_with_pdfplumber(file_data)
         elif method == "auto":
-            # Try pdfplumber first (usually better quality), fall back to PyPDF2
+            # Try PyPDF2 first (much faster); use pdfplumber only when
+            # PyPDF2 fails or yields too little text per page
+            pypdf2_text = ""
             try:
-                text = cls.extract_with_pdfplumber(file_data)
-                if text.strip():
-                    return text
+                pypdf2_text, pages = cls._extract_with_pypdf2_pages(file_data)
+                if pypdf2_text.strip() and len(pypdf2_text) / max(pages, 1) > _MIN_CHARS_PER_PAGE:
+                    return pypdf2_text
             except PDFExtractionError:
                 pass
 
             try:
-                return cls.extract_with_pypdf2(file_data)
+                text = cls.extract_with_pdfplumber(file_data)
+                if text.strip():
+                    return text
             except PDFExtractionError:
                 pass
 
-            return ""
+            return pypdf2_text
         else:
             raise ValueError(f"Unknown extraction method: {method}")
 
+    @staticmethod
+    def submit(filename: str, file_data: bytes, in_process: bool = False) -> Future:
+        """
+        Start extracting one file in the worker process pool.
+
+        Args:
+            filename: Name of the file
+            file_data: PDF file contents as bytes
+            in_process: Parse right here instead, skipping the pickling
+                round trip when there is nothing to run in parallel
+
+        Returns:
+            Future of (extracted_text, error_message)
+        """
+        if in_process:
+            future = Future()
+            future.set_result(_extract_one((filename, file_data)))
+            return future
+        return _submit((filename, file_data))
+
+    @staticmethod
+    def result(future: Future, filename: str, file_data: bytes) -> tuple[str, Optional[str]]:
+        """
+        Wait for a submitted extraction.
+
+        If a worker process died (the pool is broken), the file is retried
+        once in a fresh pool; a second crash is reported as an error.
+
+        Args:
+            future: Future returned by submit
+            filename: Name of the file
+            file_data: PDF file contents as bytes
+
+        Returns:
+            Tuple of (extracted_text, error_message)
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            pass
+        try:
+            return _submit((filename, file_data)).result()
+        except BrokenProcessPool:
+            return "", "PDF worker process crashed"
+
+    @staticmethod
+    def combine_results(
+        filenames: list[str],
+        results: list[tuple[str, Optional[str]]],
+        separator: str = "\n\n---\n\n",
+    ) -> tuple[str, list[str], list[str]]:
+        """
+        Combine per-file extraction results.
+
+        Args:
+            filenames: File names in output order
+            results: (extracted_text, error_message) for each file
+            separator: Text separator between files
+
+        Returns:
+            Tuple of (combined_text, processed_files, errors)
+        """
+        texts = []
+        processed = []
+        errors = []
+
+        for filename, (text, error) in zip(filenames, results):
+            if error:
+                errors.append(f"{filename}: {error}")
+            elif text.strip():
+                texts.append(text)
+                processed.append(filename)
+            else:
+                errors.append(f"{filename}: Empty text extracted")
+
+        combined_text = separator.join(texts) if texts else ""
+        return combined_text, processed, errors if errors else None
+
     @classmethod
     def extract_multiple(
         cls,
@@ -108,20 +268,15 @@ class PDFExtractor:
         Returns:
             Tuple of (combined_text, processed_files, errors)
         """
-        texts = []
-        processed = []
-        errors = []
-
-        for filename, file_data in files_data:
+        if len(files_data) < _PARALLEL_MIN_FILES:
+            results = [_extract_one(item) for item in files_data]
+        else:
+            pool = _get_process_pool()
             try:
-                text = cls.extract(file_data)
-                if text.strip():
-                    texts.append(text)
-                    processed.append(filename)
-                else:
-                    errors.append(f"{filename}: Empty text extracted")
-            except PDFExtractionError as e:
-                errors.append(f"{filename}: {e}")
+                results = list(pool.map(_extract_one, files_data, chunksize=8))
+            except BrokenProcessPool:
+                # A worker died; retry the batch once in a fresh pool
+                _discard_process_pool(pool)
+                results = list(_get_process_pool().map(_extract_one, files_data, chunksize=8))
 
-        combined_text = separator.join(texts) if texts else ""
-        return combined_text, processed, errors if errors else None
+        return cls.combine_results([filename for filename, _ in files_data], results, separator)
@@ -7,6 +7,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 import click
+import orjson
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from rich.console import Console
 from rich.table import Table
 
@@ -35,7 +38,9 @@ def cli():
 @click.option("--poll-interval", type=int, help="OCR poll interval in seconds")
 @click.option("--max-concurrent", type=int, help="Max concurrent OCR requests")
 @click.option("--output-format", type=click.Choice(["parquet", "csv"]), default="parquet")
-def run(run_all, step, resume, incremental, limit, poll_interval, max_concurrent, output_format):
+@click.option("--refresh-listing", is_flag=True, help="Ignore saved MinIO listings (step 1)")
+def run(run_all, step, resume, incremental, limit, poll_interval, max_concurrent, output_format,
+        refresh_listing):
     """Run pipeline steps."""
     if not run_all and step is None:
         console.print("[red]Error: Specify --all or --step[/red]")
@@ -49,7 +54,7 @@ def run(run_all, step, resume, incremental, limit, poll_interval, max_concurrent
         try:
             if step_num == 1:
                 runner = Step1BaseDataset()
-                runner.run(limit=limit)
+                runner.run(limit=limit, refresh_listing=refresh_listing)
 
             elif step_num == 2:
                 runner = Step2TechSpecs()
@@ -86,9 +91,8 @@ def status():
     # Step 1
     step1_output = output_dir / "step1_base_dataset.parquet"
     if step1_output.exists():
-        import pandas as pd
-        df = pd.read_parquet(step1_output)
-        table.add_row("Step 1: Base Dataset", "Completed", f"{len(df)} records", "-")
+        num_rows = pq.ParquetFile(step1_output).metadata.num_rows
+        table.add_row("Step 1: Base Dataset", "Completed", f"{num_rows} records", "-")
     else:
         table.add_row("Step 1: Base Dataset", "Not started", "-", "-")
 
@@ -119,9 +123,8 @@ def status():
     # Step 4
     step4_output = output_dir / "final_dataset.parquet"
     if step4_output.exists():
-        import pandas as pd
-        df = pd.read_parquet(step4_output)
-        table.add_row("Step 4: Classification", "Completed", f"{len(df)} records", "-")
+        num_rows = pq.ParquetFile(step4_output).metadata.num_rows
+        table.add_row("Step 4: Classification", "Completed", f"{num_rows} records", "-")
     else:
         table.add_row("Step 4: Classification", "Not started", "-", "-")
 
@@ -153,19 +156,24 @@ def reset(step, reset_all):
                 output_dir / "step1_base_dataset.parquet",
                 state_dir / "document_mapping.json",
             ]
+            files.extend(state_dir.glob("listing_*.json"))
         elif step_num == 2:
             files = [
                 output_dir / "step2_tech_specs.parquet",
                 output_dir / "step2_tech_specs_partial.parquet",
+                state_dir / "step2_tech_specs_progress.bin",
                 state_dir / "step2_tech_specs_progress.json",
+                state_dir / "step2_tech_specs_progress.delta.jsonl",
             ]
-            for chunk in output_dir.glob("step2_tech_specs_chunk_*.parquet"):
-                files.append(chunk)
+            for pattern in ("step2_tech_specs_chunk_*.arrows", "step2_tech_specs_chunk_*.parquet"):
+                files.extend(output_dir.glob(pattern))
         elif step_num == 3:
             files = [
                 output_dir / "step3_permit_license.parquet",
                 output_dir / "step3_permit_license_partial.parquet",
+                state_dir / "step3_permit_license_progress.bin",
                 state_dir / "step3_permit_license_progress.json",
+                state_dir / "step3_permit_license_progress.delta.jsonl",
             ]
             for chunk in output_dir.glob("step3_permit_license_chunk_*.parquet"):
                 files.append(chunk)
@@ -173,6 +181,7 @@ def reset(step, reset_all):
             files = [
                 output_dir / "final_dataset.parquet",
                 output_dir / "final_dataset.csv",
+                state_dir / "classify_cache.sqlite",
             ]
 
         for f in files:
@@ -228,14 +237,17 @@ def check():
 
 
 @cli.command(name="refresh-mapping")
-def refresh_mapping():
+@click.option(
+    "--use-cached-listing",
+    is_flag=True,
+    help="Reuse a saved MinIO listing younger than MINIO_LISTING_TTL_SECONDS",
+)
+def refresh_mapping(use_cached_listing):
     """Refresh document mapping from MinIO without recreating base dataset.
 
     Use this when new files were added to MinIO but the database hasn't changed.
     After refreshing, run step 2/3 with --incremental to process only new files.
     """
-    import pandas as pd
-
     output_dir = settings.paths.output_dir
     base_dataset_path = output_dir / "step1_base_dataset.parquet"
 
@@ -244,13 +256,16 @@ def refresh_mapping():
         return
 
     console.print("Loading existing base dataset...")
-    df = pd.read_parquet(base_dataset_path)
-    saf_numbers = df["saf_number"].unique().tolist()
+    # Only the saf_number column is needed; dedupe in Arrow (order of first appearance)
+    saf_column = pq.read_table(base_dataset_path, columns=["saf_number"])["saf_number"]
+    saf_numbers = pc.unique(saf_column).to_pylist()
     console.print(f"Found {len(saf_numbers)} unique SAF numbers")
 
     console.print("Refreshing document mapping from MinIO...")
     runner = Step1BaseDataset()
-    mapping = runner._create_document_mapping(saf_numbers)
+    mapping = runner._create_document_mapping(
+        saf_numbers, refresh_listing=not use_cached_listing
+    )
 
     total_specs = len(mapping.get("specs", {}))
     total_permit = len(mapping.get("permit", {}))
@@ -263,6 +278,22 @@ def refresh_mapping():
     console.print("\nRun 'python main.py run --step 2 --incremental' to process new files")
 
 
+@cli.command(name="dump-state")
+@click.option("--step", type=click.IntRange(2, 3), required=True, help="Step whose state to print (2-3)")
+def dump_state(step):
+    """Print saved state of a step as JSON.
+
+    State is stored in a binary format; this shows it with the delta log applied.
+    """
+    step_names = {2: "step2_tech_specs", 3: "step3_permit_license"}
+    state_manager = StateManager(step_names[step], settings.paths.state_dir)
+    if not state_manager.exists():
+        console.print(f"[red]No saved state for step {step}[/red]")
+        return
+    state = state_manager.load()
+    click.echo(orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8"))
+
+
 @cli.command()
 def stats():
     """Show statistics about final dataset."""
@@ -1,6 +1,6 @@
 """Step 1: Create base dataset from PostgreSQL."""
 
-import json
+import time
 from pathlib import Path
 from typing import Optional
 import pandas as pd
@@ -8,7 +8,9 @@ import pandas as pd
 from core.database import Database
 from core.minio_client import MinIOClient
 from config.settings import settings
+from utils.json_file import read_json, write_json
 from utils.logger import get_step_logger
+from utils.parquet import write_parquet
 
 
 class Step1BaseDataset:
@@ -31,12 +33,13 @@ class Step1BaseDataset:
         self._output_dir.mkdir(parents=True, exist_ok=True)
         self._state_dir.mkdir(parents=True, exist_ok=True)
 
-    def run(self, limit: Optional[int] = None) -> pd.DataFrame:
+    def run(self, limit: Optional[int] = None, refresh_listing: bool = False) -> pd.DataFrame:
         """
         Run step 1: create base dataset.
 
         Args:
             limit: Optional limit on number of records
+            refresh_listing: List MinIO even if a recent saved listing exists
 
         Returns:
             Base dataset DataFrame
@@ -57,21 +60,50 @@ class Step1BaseDataset:
 
         # Save base dataset
         output_path = self._output_dir / "step1_base_dataset.parquet"
-        df.to_parquet(output_path, index=False)
+        write_parquet(df, output_path)
         self._logger.info(f"Saved base dataset to {output_path}")
 
         # Create document mapping
-        self._create_document_mapping(df["saf_number"].unique().tolist())
+        self._create_document_mapping(df["saf_number"].unique().tolist(), refresh_listing)
 
         self._logger.info("Step 1 completed successfully")
         return df
 
-    def _create_document_mapping(self, saf_numbers: list[str]) -> dict:
+    def _listing_cache_path(self, directory: str) -> Path:
+        return self._state_dir / f"listing_{directory}.json"
+
+    def _load_listing_cache(self, directory: str) -> Optional[dict[str, list[str]]]:
+        """Load the saved listing of a directory if it is younger than the TTL."""
+        path = self._listing_cache_path(directory)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        ttl = settings.minio.listing_ttl_seconds
+        if ttl <= 0 or age > ttl:
+            return None
+        try:
+            return read_json(path)
+        except ValueError:
+            # Partially written file, list again
+            return None
+
+    def _save_listing_cache(self, directory: str, listing: dict[str, list[str]]) -> None:
+        """Save a directory listing for reuse by later runs."""
+        if settings.minio.listing_ttl_seconds > 0:
+            write_json(self._listing_cache_path(directory), listing)
+
+    def _create_document_mapping(
+        self,
+        saf_numbers: list[str],
+        refresh_listing: bool = False,
+    ) -> dict:
         """
         Create mapping of SAF numbers to document files.
 
         Args:
             saf_numbers: List of SAF numbers to process
+            refresh_listing: List MinIO even if a recent saved listing exists
 
         Returns:
             Document mapping dictionary
@@ -84,15 +116,25 @@ class Step1BaseDataset:
             "license": {},
         }
 
+        requested = set(saf_numbers)
         for directory in mapping.keys():
             self._logger.info(f"Scanning {directory}/ directory...")
-            saf_with_files = self._minio.get_all_saf_numbers_with_files(directory)
-
-            for saf_number in saf_numbers:
-                if saf_number in saf_with_files:
-                    files = self._minio.get_files_for_saf(saf_number, directory)
-                    if files:
-                        mapping[directory][saf_number] = files
+            files_by_saf = None if refresh_listing else self._load_listing_cache(directory)
+            if files_by_saf is None:
+                # One recursive listing per directory instead of one per SAF number
+                files_by_saf = self._minio.get_files_by_saf(directory)
+                # Empty may mean a failed listing, don't keep it
+                if files_by_saf:
+                    self._save_listing_cache(directory, files_by_saf)
+            else:
+                self._logger.info(f"Using saved listing of {directory}/")
+
+            # Intersect with requested SAF numbers, keeping listing order
+            mapping[directory] = {
+                saf_number: files
+                for saf_number, files in files_by_saf.items()
+                if files and saf_number in requested
+            }
 
             self._logger.info(
                 f"Found {len(mapping[directory])} SAF numbers with files in {directory}/"
@@ -100,8 +142,7 @@ class Step1BaseDataset:
 
         # Save mapping
         mapping_path = self._state_dir / "document_mapping.json"
-        with open(mapping_path, "w", encoding="utf-8") as f:
-            json.dump(mapping, f, ensure_ascii=False, indent=2)
+        write_json(mapping_path, mapping)
         self._logger.info(f"Saved document mapping to {mapping_path}")
 
         return mapping
@@ -110,6 +151,5 @@ class Step1BaseDataset:
         """Load existing document mapping."""
         mapping_path = self._state_dir / "document_mapping.json"
         if mapping_path.exists():
-            with open(mapping_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return read_json(mapping_path)
         return {"specs": {}, "permit": {}, "license": {}}
@@ -1,18 +1,37 @@
 """Step 2: OCR extraction for technical specifications."""
 
 import asyncio
-import json
+import re
 from pathlib import Path
 from typing import Optional
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 from core.minio_client import MinIOClient
 from core.ocr_client import OCRClient
 from extractors.ocr_extractor import OCRExtractor
 from config.settings import settings
+from utils.json_file import read_json
 from utils.logger import get_step_logger
+from utils.parquet import write_parquet
 from utils.progress import StateManager, ProgressTracker
 
+_CHUNK_NUM_RE = re.compile(r"_(\d+)\.(?:arrows|parquet)$")
+# Chunks are Arrow IPC streams, readable up to the last complete batch
+# even if a run is interrupted; .parquet chunks come from older versions
+_CHUNK_GLOBS = ("step2_tech_specs_chunk_*.arrows", "step2_tech_specs_chunk_*.parquet")
+_CHUNK_SCHEMA = pa.schema([
+    ("saf_number", pa.string()),
+    ("tech_description", pa.string()),
+    ("tech_files_processed", pa.list_(pa.string())),
+    ("tech_ocr_errors", pa.list_(pa.string())),
+])
+# SAF numbers in flight per OCR slot; extra ones download while OCR is busy
+_SAF_PREFETCH_FACTOR = 2
+
 
 class Step2TechSpecs:
     """Extract text from technical specifications using OCR."""
@@ -31,8 +50,17 @@ class Step2TechSpecs:
         self._output_dir = output_dir or settings.paths.output_dir
         self._state_dir = state_dir or settings.paths.state_dir
         self._batch_size = batch_size or settings.batch_size
+        self._max_concurrent = settings.ocr.max_concurrent
         self._logger = get_step_logger("step2_tech_specs")
         self._state_manager = StateManager("step2_tech_specs", self._state_dir)
+        # Next chunk number; scanned once so checkpoints don't probe the filesystem
+        self._chunk_counter = max(
+            (int(_CHUNK_NUM_RE.search(p.name).group(1)) for p in self._chunk_files()),
+            default=-1,
+        ) + 1
+        # One chunk stream per run, appended to at each checkpoint
+        self._chunk_sink: Optional[pa.NativeFile] = None
+        self._chunk_writer: Optional[pa.ipc.RecordBatchStreamWriter] = None
 
     def _ensure_dirs(self) -> None:
         self._output_dir.mkdir(parents=True, exist_ok=True)
@@ -45,8 +73,7 @@ class Step2TechSpecs:
             raise FileNotFoundError(
                 f"Document mapping not found at {mapping_path}. Run step 1 first."
             )
-        with open(mapping_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_json(mapping_path)
 
     def run(
         self,
@@ -95,12 +122,12 @@ class Step2TechSpecs:
         if incremental:
             saf_numbers_to_process = self._state_manager.get_saf_numbers_with_new_files(specs_mapping)
             # Filter to only those in our saf_numbers list (respects limit)
-            saf_numbers_to_process = [s for s in saf_numbers_to_process if s in saf_numbers]
+            limited = set(saf_numbers)
+            saf_numbers_to_process = [s for s in saf_numbers_to_process if s in limited]
             self._logger.info(
                 f"Incremental mode: {len(saf_numbers_to_process)} SAF numbers with new files"
             )
             saf_numbers = saf_numbers_to_process
-            # processed remains from state - allows resume within incremental run
 
         self._state_manager.set_total(len(saf_numbers))
 
@@ -108,6 +135,15 @@ class Step2TechSpecs:
         if not (resume or incremental):
             self._cleanup_partial_results()
 
+        # Skip SAF numbers already done. In incremental mode the new-files check
+        # already excludes those finished earlier, and previously processed SAF
+        # numbers with new files must be processed again
+        if incremental:
+            pending = saf_numbers
+        else:
+            pending = [s for s in saf_numbers if s not in processed]
+        skipped = len(saf_numbers) - len(pending)
+
         # Process SAF numbers
         results = []
 
@@ -116,26 +152,134 @@ class Step2TechSpecs:
             len(saf_numbers),
             self._state_manager,
         ) as progress:
-            for i, saf_number in enumerate(saf_numbers):
-                if saf_number in processed:
-                    continue
+            progress.update(skipped)
+            # One event loop drives all SAF numbers concurrently
+            try:
+                self._extractor.run(
+                    self._process_all(pending, specs_mapping, skipped, results, progress)
+                )
+            except BaseException:
+                # Results of an interrupted run stay readable for resume
+                self._close_chunk_writer()
+                raise
+            finally:
+                self._extractor.close()
+
+        # Final save; results go to disk before the state that marks them processed
+        if results:
+            self._save_partial_results(results)
+            results.clear()
+        self._close_chunk_writer()
+        self._state_manager.save()
+        self._state_manager.close()
 
-                try:
-                    self._logger.info(
-                        f"Processing saf_number={saf_number}, "
-                        f"files={len(specs_mapping[saf_number])}"
-                    )
+        chunk_files = self._chunk_files()
+        output_path = self._output_dir / "step2_tech_specs.parquet"
 
-                    text, files_processed, errors = asyncio.run(
-                        self._extractor.process_saf_files(saf_number, "specs")
-                    )
+        if not chunk_files and (resume or incremental) and output_path.exists():
+            # Nothing new, keep the existing output as is
+            self._logger.info(f"No new records, keeping existing {output_path}")
+            self._logger.info("Step 2 completed successfully")
+            return pd.DataFrame()
+
+        if chunk_files:
+            table_new = self._keep_last_per_saf(pa.concat_tables(
+                [self._read_chunk(p) for p in chunk_files], promote_options="permissive"
+            ))
+
+            # In incremental mode, merge with existing results
+            if incremental and output_path.exists():
+                # Drop old entries for reprocessed SAF numbers at scan time
+                reprocessed_saf = pc.unique(table_new["saf_number"])
+                table_existing = self._scan_parquet([output_path]).to_table(
+                    filter=~ds.field("saf_number").isin(reprocessed_saf)
+                )
+                table = pa.concat_tables(
+                    [table_existing, table_new], promote_options="permissive"
+                )
+                self._logger.info(
+                    f"Merged {table_new.num_rows} new/updated records "
+                    f"with {table_existing.num_rows} existing"
+                )
+            else:
+                table = table_new
+
+            write_parquet(table, output_path)
+            df = table.to_pandas()
+        else:
+            df = pd.DataFrame()
+            write_parquet(df, output_path)
+
+        self._cleanup_partial_results()
+        self._logger.info(f"Saved tech specs to {output_path} ({len(df)} total records)")
+
+        self._logger.info("Step 2 completed successfully")
+        return df
+
+    async def _process_saf(
+        self,
+        saf_number: str,
+        specs_mapping: dict,
+        semaphore: asyncio.Semaphore,
+    ) -> tuple[str, Optional[dict], Optional[Exception]]:
+        """
+        OCR all specs files of one SAF number.
+
+        Returns:
+            Tuple of (saf_number, result, exception); exactly one of result
+            and exception is set
+        """
+        async with semaphore:
+            try:
+                self._logger.info(
+                    f"Processing saf_number={saf_number}, "
+                    f"files={len(specs_mapping[saf_number])}"
+                )
+
+                text, files_processed, errors = await self._extractor.process_saf_files(
+                    saf_number, "specs", files=specs_mapping[saf_number]
+                )
+
+                result = {
+                    "saf_number": saf_number,
+                    "tech_description": text,
+                    "tech_files_processed": files_processed,
+                    "tech_ocr_errors": errors,
+                }
+                return saf_number, result, None
+            except Exception as e:
+                return saf_number, None, e
+
+    async def _process_all(
+        self,
+        saf_numbers: list[str],
+        specs_mapping: dict,
+        skipped: int,
+        results: list[dict],
+        progress: ProgressTracker,
+    ) -> None:
+        """
+        Process SAF numbers concurrently, checkpointing as results complete.
 
-                    result = {
-                        "saf_number": saf_number,
-                        "tech_description": text,
-                        "tech_files_processed": files_processed,
-                        "tech_ocr_errors": errors,
-                    }
+        Args:
+            saf_numbers: SAF numbers to process
+            specs_mapping: Mapping of SAF number to specs file paths
+            skipped: Number of SAF numbers already processed before this run
+            results: Buffer for results not yet saved as a chunk
+            progress: Progress tracker to advance
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrent * _SAF_PREFETCH_FACTOR)
+        tasks = [
+            asyncio.ensure_future(self._process_saf(saf_number, specs_mapping, semaphore))
+            for saf_number in saf_numbers
+        ]
+        total = skipped + len(saf_numbers)
+
+        try:
+            for completed, next_done in enumerate(asyncio.as_completed(tasks), start=1):
+                saf_number, result, error = await next_done
+
+                if error is None:
                     results.append(result)
 
                     self._state_manager.mark_processed(saf_number)
@@ -144,80 +288,107 @@ class Step2TechSpecs:
                         saf_number, specs_mapping.get(saf_number, [])
                     )
 
+                    text = result["tech_description"]
                     if text:
                         self._logger.info(
                             f"OCR completed for saf_number={saf_number}, chars={len(text)}"
                         )
-
-                except Exception as e:
-                    self._logger.error(f"Failed {saf_number}: {e}")
-                    self._state_manager.mark_failed(saf_number, str(e))
+                else:
+                    self._logger.error(f"Failed {saf_number}: {error}")
+                    self._state_manager.mark_failed(saf_number, str(error))
 
                 progress.advance()
 
                 # Checkpoint
-                if (i + 1) % self._batch_size == 0:
-                    self._state_manager.update_batch(i + 1)
-                    self._state_manager.save()
+                if completed % self._batch_size == 0:
                     self._save_partial_results(results)
                     results.clear()
+                    self._state_manager.update_batch(skipped + completed)
+                    self._state_manager.save()
                     self._logger.info(
-                        f"Checkpoint: {len(self._state_manager.get_processed())}/{len(saf_numbers)}"
+                        f"Checkpoint: {len(self._state_manager.get_processed())}/{total}"
                     )
+        finally:
+            # On early exit, don't leave tasks running on a loop about to close
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Final save
-        self._state_manager.save()
-        if results:
-            self._save_partial_results(results)
-            results.clear()
-
-        df_new = self._load_all_partial_results()
-        self._cleanup_partial_results()
-        output_path = self._output_dir / "step2_tech_specs.parquet"
-
-        # In incremental mode, merge with existing results
-        if incremental and output_path.exists() and not df_new.empty:
-            df_existing = pd.read_parquet(output_path)
-            # Remove old entries for SAF numbers we just reprocessed
-            reprocessed_saf = set(df_new["saf_number"].tolist())
-            df_existing = df_existing[~df_existing["saf_number"].isin(reprocessed_saf)]
-            # Combine
-            df = pd.concat([df_existing, df_new], ignore_index=True)
-            self._logger.info(
-                f"Merged {len(df_new)} new/updated records with {len(df_existing)} existing"
-            )
-        else:
-            df = df_new
-
-        df.to_parquet(output_path, index=False)
-        self._logger.info(f"Saved tech specs to {output_path} ({len(df)} total records)")
-
-        self._logger.info("Step 2 completed successfully")
-        return df
+    def _chunk_files(self) -> list[Path]:
+        """List chunk files in the order they were written."""
+        files = [p for pattern in _CHUNK_GLOBS for p in self._output_dir.glob(pattern)]
+        return sorted(files, key=lambda p: int(_CHUNK_NUM_RE.search(p.name).group(1)))
 
     def _save_partial_results(self, results: list[dict]) -> None:
-        """Save a batch of results as a numbered chunk file."""
+        """Append a batch of results to this run's chunk stream."""
         if not results:
             return
-        df = pd.DataFrame(results)
-        chunk_num = 0
-        while (self._output_dir / f"step2_tech_specs_chunk_{chunk_num}.parquet").exists():
-            chunk_num += 1
-        chunk_path = self._output_dir / f"step2_tech_specs_chunk_{chunk_num}.parquet"
-        df.to_parquet(chunk_path, index=False)
-
-    def _load_all_partial_results(self) -> pd.DataFrame:
-        """Load and combine all chunk files into a single DataFrame."""
-        chunk_files = sorted(self._output_dir.glob("step2_tech_specs_chunk_*.parquet"))
-        if not chunk_files:
-            return pd.DataFrame()
-        chunks = [pd.read_parquet(f) for f in chunk_files]
-        return pd.concat(chunks, ignore_index=True)
+        if self._chunk_writer is None:
+            chunk_path = self._output_dir / f"step2_tech_specs_chunk_{self._chunk_counter}.arrows"
+            self._chunk_counter += 1
+            self._chunk_sink = pa.OSFile(str(chunk_path), "wb")
+            self._chunk_writer = pa.ipc.new_stream(self._chunk_sink, _CHUNK_SCHEMA)
+        self._chunk_writer.write_table(pa.Table.from_pylist(results, schema=_CHUNK_SCHEMA))
+        self._chunk_sink.flush()
+
+    def _close_chunk_writer(self) -> None:
+        """Finish the current chunk stream, if any."""
+        if self._chunk_writer is not None:
+            self._chunk_writer.close()
+            self._chunk_sink.close()
+            self._chunk_writer = None
+            self._chunk_sink = None
+
+    @staticmethod
+    def _keep_last_per_saf(table: pa.Table) -> pa.Table:
+        """
+        Drop all but the latest row of each SAF number.
+
+        Results are written before the state that marks them processed, so
+        an interrupt in between makes resume process some SAF numbers twice.
+        """
+        if pc.count_distinct(table["saf_number"]).as_py() == table.num_rows:
+            return table
+        last_rows = (
+            table.select(["saf_number"])
+            .append_column("row", pa.array(range(table.num_rows), pa.int64()))
+            .group_by("saf_number")
+            .aggregate([("row", "max")])["row_max"]
+        )
+        # Keep rows in their original order
+        return table.take(pc.take(last_rows, pc.sort_indices(last_rows)))
+
+    def _read_chunk(self, path: Path) -> pa.Table:
+        """Read a chunk file, keeping all complete batches of a truncated stream."""
+        if path.suffix == ".parquet":
+            return pq.read_table(path)
+        batches = []
+        with pa.memory_map(str(path)) as source:
+            try:
+                for batch in pa.ipc.open_stream(source):
+                    batches.append(batch)
+            except (OSError, pa.ArrowInvalid) as e:
+                self._logger.warning(f"Chunk {path.name} is truncated, keeping complete batches: {e}")
+            return pa.Table.from_batches(batches, schema=_CHUNK_SCHEMA)
+
+    @staticmethod
+    def _scan_parquet(paths: list[Path]) -> ds.Dataset:
+        """
+        Open parquet files as one lazily scanned dataset.
+
+        Chunk schemas may differ where a batch had only nulls in a column,
+        so the dataset schema is unified from the file footers.
+        """
+        schema = pa.unify_schemas(
+            [pq.read_schema(p) for p in paths], promote_options="permissive"
+        )
+        return ds.dataset(paths, schema=schema.remove_metadata(), format="parquet")
 
     def _cleanup_partial_results(self) -> None:
         """Remove all chunk files and old-style partial file."""
-        for f in self._output_dir.glob("step2_tech_specs_chunk_*.parquet"):
+        for f in self._chunk_files():
             f.unlink()
+        self._chunk_counter = 0
         partial_path = self._output_dir / "step2_tech_specs_partial.parquet"
         if partial_path.exists():
             partial_path.unlink()
@@ -1,6 +1,7 @@
 """Step 3: Extract text from permit and license documents."""
 
-import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional
 import pandas as pd
@@ -8,9 +9,13 @@ import pandas as pd
 from core.minio_client import MinIOClient
 from extractors.pdf_extractor import PDFExtractor
 from config.settings import settings
+from utils.json_file import read_json
 from utils.logger import get_step_logger
+from utils.parquet import write_parquet
 from utils.progress import StateManager, ProgressTracker
 
+_CHUNK_NUM_RE = re.compile(r"_(\d+)\.parquet$")
+
 
 class Step3PermitLicense:
     """Extract text from permit and license PDFs."""
@@ -28,6 +33,20 @@ class Step3PermitLicense:
         self._batch_size = batch_size or settings.batch_size
         self._logger = get_step_logger("step3_permit_license")
         self._state_manager = StateManager("step3_permit_license", self._state_dir)
+        self._download_pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def download_pool(self) -> ThreadPoolExecutor:
+        """Thread pool for MinIO downloads, shared across SAF numbers."""
+        if self._download_pool is None:
+            self._download_pool = ThreadPoolExecutor(max_workers=settings.minio.max_workers)
+        return self._download_pool
+
+    def close(self) -> None:
+        """Shut down the download pool."""
+        if self._download_pool is not None:
+            self._download_pool.shutdown(wait=True)
+            self._download_pool = None
 
     def _ensure_dirs(self) -> None:
         self._output_dir.mkdir(parents=True, exist_ok=True)
@@ -40,8 +59,7 @@ class Step3PermitLicense:
             raise FileNotFoundError(
                 f"Document mapping not found at {mapping_path}. Run step 1 first."
             )
-        with open(mapping_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_json(mapping_path)
 
     def _extract_from_directory(
         self,
@@ -63,19 +81,35 @@ class Step3PermitLicense:
         if not file_paths:
             return None, [], None
 
-        files_data = []
-        for file_path in file_paths:
+        filenames = [file_path.split("/")[-1] for file_path in file_paths]
+        downloads = {
+            self.download_pool.submit(self._minio.download_file, file_path): i
+            for i, file_path in enumerate(file_paths)
+        }
+
+        # Parse each file in worker processes as soon as it arrives,
+        # overlapping with the downloads still in flight; a single file
+        # is parsed in-process since there is nothing to overlap with
+        in_process = len(file_paths) == 1
+        extractions = {}
+        for future in as_completed(downloads):
+            i = downloads[future]
             try:
-                file_data = self._minio.download_file(file_path)
-                filename = file_path.split("/")[-1]
-                files_data.append((filename, file_data))
+                file_data = future.result()
             except Exception as e:
-                self._logger.warning(f"Failed to download {file_path}: {e}")
+                self._logger.warning(f"Failed to download {file_paths[i]}: {e}")
+                continue
+            extractions[i] = (PDFExtractor.submit(filenames[i], file_data, in_process), file_data)
 
-        if not files_data:
+        if not extractions:
             return None, [], ["All files failed to download"]
 
-        return PDFExtractor.extract_multiple(files_data)
+        # Combine in original file order so the text is stable
+        order = sorted(extractions)
+        return PDFExtractor.combine_results(
+            [filenames[i] for i in order],
+            [PDFExtractor.result(extractions[i][0], filenames[i], extractions[i][1]) for i in order],
+        )
 
     def run(
         self,
@@ -136,12 +170,12 @@ class Step3PermitLicense:
                 combined_mapping
             )
             # Filter to only those in our saf_numbers list (respects limit)
-            saf_numbers_to_process = [s for s in saf_numbers_to_process if s in saf_numbers]
+            limited = set(saf_numbers)
+            saf_numbers_to_process = [s for s in saf_numbers_to_process if s in limited]
             self._logger.info(
                 f"Incremental mode: {len(saf_numbers_to_process)} SAF numbers with new files"
             )
             saf_numbers = saf_numbers_to_process
-            # processed remains from state - allows resume within incremental run
 
         self._state_manager.set_total(len(saf_numbers))
 
@@ -149,6 +183,15 @@ class Step3PermitLicense:
         if not (resume or incremental):
             self._cleanup_partial_results()
 
+        # Skip SAF numbers already done. In incremental mode the new-files check
+        # already excludes those finished earlier, and previously processed SAF
+        # numbers with new files must be processed again
+        if incremental:
+            pending = saf_numbers
+        else:
+            pending = [s for s in saf_numbers if s not in processed]
+        skipped = len(saf_numbers) - len(pending)
+
         # Process SAF numbers
         results = []
 
@@ -157,72 +200,80 @@ class Step3PermitLicense:
             len(saf_numbers),
             self._state_manager,
         ) as progress:
-            for i, saf_number in enumerate(saf_numbers):
-                if saf_number in processed:
-                    continue
-
-                try:
-                    # Process permit files
-                    permit_files = permit_mapping.get(saf_number, [])
-                    permit_text, permit_processed, permit_errors = self._extract_from_directory(
-                        saf_number, "permit", permit_files
-                    )
-
-                    # Process license files
-                    license_files = license_mapping.get(saf_number, [])
-                    license_text, license_processed, license_errors = self._extract_from_directory(
-                        saf_number, "license", license_files
-                    )
-
-                    result = {
-                        "saf_number": saf_number,
-                        "permit_text": permit_text,
-                        "license_text": license_text,
-                        "permit_files_processed": permit_processed,
-                        "license_files_processed": license_processed,
-                    }
-                    results.append(result)
-
-                    self._state_manager.mark_processed(saf_number)
-                    # Track which files were processed for incremental updates
-                    self._state_manager.mark_files_processed(
-                        saf_number, permit_files + license_files
-                    )
-
-                    self._logger.info(
-                        f"Processed saf_number={saf_number}, "
-                        f"permit_chars={len(permit_text or '')}, "
-                        f"license_chars={len(license_text or '')}"
-                    )
-
-                except Exception as e:
-                    self._logger.error(f"Failed {saf_number}: {e}")
-                    self._state_manager.mark_failed(saf_number, str(e))
-
-                progress.advance()
-
-                # Checkpoint
-                if (i + 1) % self._batch_size == 0:
-                    self._state_manager.update_batch(i + 1)
-                    self._state_manager.save()
-                    self._save_partial_results(results)
-                    results.clear()
-                    self._logger.info(
-                        f"Checkpoint: {len(self._state_manager.get_processed())}/{len(saf_numbers)}"
-                    )
-
-        # Final save
-        self._state_manager.save()
+            progress.update(skipped)
+            try:
+                for i, saf_number in enumerate(pending):
+                    try:
+                        # Process permit files
+                        permit_files = permit_mapping.get(saf_number, [])
+                        permit_text, permit_processed, permit_errors = self._extract_from_directory(
+                            saf_number, "permit", permit_files
+                        )
+
+                        # Process license files
+                        license_files = license_mapping.get(saf_number, [])
+                        license_text, license_processed, license_errors = self._extract_from_directory(
+                            saf_number, "license", license_files
+                        )
+
+                        result = {
+                            "saf_number": saf_number,
+                            "permit_text": permit_text,
+                            "license_text": license_text,
+                            "permit_files_processed": permit_processed,
+                            "license_files_processed": license_processed,
+                        }
+                        results.append(result)
+
+                        self._state_manager.mark_processed(saf_number)
+                        # Track which files were processed for incremental updates
+                        self._state_manager.mark_files_processed(
+                            saf_number, permit_files + license_files
+                        )
+
+                        self._logger.info(
+                            f"Processed saf_number={saf_number}, "
+                            f"permit_chars={len(permit_text or '')}, "
+                            f"license_chars={len(license_text or '')}"
+                        )
+
+                    except Exception as e:
+                        self._logger.error(f"Failed {saf_number}: {e}")
+                        self._state_manager.mark_failed(saf_number, str(e))
+
+                    progress.advance()
+
+                    # Checkpoint
+                    if (i + 1) % self._batch_size == 0:
+                        self._save_partial_results(results)
+                        results.clear()
+                        self._state_manager.update_batch(skipped + i + 1)
+                        self._state_manager.save()
+                        self._logger.info(
+                            f"Checkpoint: {len(self._state_manager.get_processed())}/{len(saf_numbers)}"
+                        )
+            finally:
+                self.close()
+
+        # Final save; results go to disk before the state that marks them processed
         if results:
             self._save_partial_results(results)
             results.clear()
+        self._state_manager.save()
+        self._state_manager.close()
 
         df_new = self._load_all_partial_results()
         self._cleanup_partial_results()
         output_path = self._output_dir / "step3_permit_license.parquet"
 
+        if df_new.empty and (resume or incremental) and output_path.exists():
+            # Nothing new, keep the existing output as is
+            self._logger.info(f"No new records, keeping existing {output_path}")
+            self._logger.info("Step 3 completed successfully")
+            return df_new
+
         # In incremental mode, merge with existing results
-        if incremental and output_path.exists() and not df_new.empty:
+        if incremental and output_path.exists():
             df_existing = pd.read_parquet(output_path)
             # Remove old entries for SAF numbers we just reprocessed
             reprocessed_saf = set(df_new["saf_number"].tolist())
@@ -235,7 +286,7 @@ class Step3PermitLicense:
         else:
             df = df_new
 
-        df.to_parquet(output_path, index=False)
+        write_parquet(df, output_path)
         self._logger.info(f"Saved permit/license data to {output_path} ({len(df)} total records)")
 
         self._logger.info("Step 3 completed successfully")
@@ -250,15 +301,25 @@ class Step3PermitLicense:
         while (self._output_dir / f"step3_permit_license_chunk_{chunk_num}.parquet").exists():
             chunk_num += 1
         chunk_path = self._output_dir / f"step3_permit_license_chunk_{chunk_num}.parquet"
-        df.to_parquet(chunk_path, index=False)
+        write_parquet(df, chunk_path)
 
     def _load_all_partial_results(self) -> pd.DataFrame:
-        """Load and combine all chunk files into a single DataFrame."""
-        chunk_files = sorted(self._output_dir.glob("step3_permit_license_chunk_*.parquet"))
+        """
+        Load and combine all chunk files into a single DataFrame.
+
+        Chunks are written before the state that marks their SAF numbers
+        processed, so an interrupt in between makes resume process some SAF
+        numbers twice; only the latest row of each is kept.
+        """
+        chunk_files = sorted(
+            self._output_dir.glob("step3_permit_license_chunk_*.parquet"),
+            key=lambda p: int(_CHUNK_NUM_RE.search(p.name).group(1)),
+        )
         if not chunk_files:
             return pd.DataFrame()
         chunks = [pd.read_parquet(f) for f in chunk_files]
-        return pd.concat(chunks, ignore_index=True)
+        df = pd.concat(chunks, ignore_index=True)
+        return df.drop_duplicates(subset="saf_number", keep="last", ignore_index=True)
 
     def _cleanup_partial_results(self) -> None:
         """Remove all chunk files and old-style partial file."""
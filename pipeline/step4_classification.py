@@ -2,11 +2,18 @@
 
 from pathlib import Path
 from typing import Optional
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
-from config.patterns import determine_license_need
+from config.patterns import determine_license_need_series
 from config.settings import settings
+from utils.classify_cache import ClassificationCache
 from utils.logger import get_step_logger
+from utils.parquet import write_parquet
 
 
 class Step4Classification:
@@ -15,19 +22,136 @@ class Step4Classification:
     def __init__(
         self,
         output_dir: Optional[Path] = None,
+        state_dir: Optional[Path] = None,
     ):
         self._output_dir = output_dir or settings.paths.output_dir
+        self._state_dir = state_dir or settings.paths.state_dir
+        self._cache = ClassificationCache(self._state_dir)
         self._logger = get_step_logger("step4_classification")
 
     def _ensure_dirs(self) -> None:
         self._output_dir.mkdir(parents=True, exist_ok=True)
 
-    def _load_step_output(self, filename: str) -> pd.DataFrame:
-        """Load output from a previous step."""
+    def _load_step_output(self, filename: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Load output from a previous step.
+
+        Args:
+            filename: Parquet file name in the output directory
+            columns: Columns to read; those missing from the file are skipped
+
+        Returns:
+            Loaded DataFrame
+        """
         path = self._output_dir / filename
         if not path.exists():
             raise FileNotFoundError(f"Step output not found: {path}")
-        return pd.read_parquet(path)
+        if columns is not None:
+            available = set(pq.read_schema(path).names)
+            columns = [col for col in columns if col in available]
+        return pd.read_parquet(path, columns=columns)
+
+    @staticmethod
+    def _agreement(license_need: pd.Series, license_need_db: pd.Series) -> Optional[float]:
+        """
+        Share of classified rows whose license_need equals the database value.
+
+        Both columns are compared as int8 codes (True=1, False=0, null=-1).
+
+        Returns:
+            Agreement ratio, or None if no row is classified
+        """
+        need = pd.array(license_need, dtype="boolean").to_numpy(dtype=np.int8, na_value=-1)
+        classified = need >= 0
+        if not classified.any():
+            return None
+        try:
+            db = pd.array(license_need_db, dtype="boolean").to_numpy(dtype=np.int8, na_value=-1)
+        except (TypeError, ValueError):
+            # Database values are not boolean-like, compare as objects
+            return float((license_need[classified] == license_need_db[classified]).mean())
+        return float(np.mean(need[classified] == db[classified]))
+
+    @staticmethod
+    def _write_csv(df: pd.DataFrame, path: Path) -> None:
+        """
+        Write a DataFrame as CSV through Arrow.
+
+        Boolean columns are written as True/False with nulls left empty, as
+        pandas to_csv did. Arrow quotes every string value, so text fields
+        are always enclosed in double quotes.
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, field in enumerate(table.schema):
+            if pa.types.is_boolean(field.type):
+                table = table.set_column(
+                    i, field.name, pc.if_else(table[field.name], "True", "False")
+                )
+        pacsv.write_csv(table, path, pacsv.WriteOptions(quoting_style="needed"))
+
+    @staticmethod
+    def _with_shared_saf_categories(*frames: pd.DataFrame) -> list[pd.DataFrame]:
+        """
+        Convert saf_number to one categorical dtype across all frames.
+
+        With identical categories pandas merges on the integer codes instead
+        of hashing the strings of every frame.
+        """
+        categories = pd.unique(
+            pd.concat([frame["saf_number"].dropna().astype(object) for frame in frames])
+        )
+        saf_dtype = pd.CategoricalDtype(categories)
+        return [
+            frame.assign(saf_number=frame["saf_number"].astype(object).astype(saf_dtype))
+            for frame in frames
+        ]
+
+    def _classify(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Determine license_need once per unique (permit_text, license_text) pair.
+
+        Verdicts are looked up in the persistent classification cache by
+        content hash; only unseen pairs are run through the patterns.
+
+        Args:
+            df: Merged dataset with permit_text and license_text columns
+
+        Returns:
+            Series of True / False / None aligned with df
+        """
+        pairs = df[["permit_text", "license_text"]]
+        codes, _ = pd.factorize(pd.util.hash_pandas_object(pairs, index=False))
+        # factorize numbers pairs by first appearance, so this picks one row per pair
+        _, first_rows = np.unique(codes, return_index=True)
+        unique_pairs = pairs.iloc[first_rows]
+
+        keys = [
+            ClassificationCache.make_key(permit_text, license_text)
+            for permit_text, license_text in zip(
+                unique_pairs["permit_text"], unique_pairs["license_text"]
+            )
+        ]
+        cached = self._cache.get_many(keys)
+
+        verdicts = np.empty(len(keys), dtype=object)
+        hit = np.fromiter((key in cached for key in keys), dtype=bool, count=len(keys))
+        for i in np.flatnonzero(hit):
+            verdicts[i] = cached[keys[i]]
+
+        # Classify all cache misses in one vectorized pass
+        miss = np.flatnonzero(~hit)
+        if len(miss):
+            misses = unique_pairs.iloc[miss]
+            verdicts[miss] = determine_license_need_series(
+                misses["permit_text"], misses["license_text"]
+            ).to_numpy()
+            self._cache.put_many({keys[i]: verdicts[i] for i in miss})
+
+        self._logger.info(
+            f"Classified {len(keys)} unique text pairs "
+            f"({int(hit.sum())} from cache)"
+        )
+        return pd.Series(verdicts[codes], index=df.index, dtype=object)
 
     def run(self, output_format: str = "parquet") -> pd.DataFrame:
         """
@@ -49,14 +173,19 @@ class Step4Classification:
         self._logger.info(f"Loaded base dataset: {len(df_base)} records")
 
         try:
-            df_specs = self._load_step_output("step2_tech_specs.parquet")
+            df_specs = self._load_step_output(
+                "step2_tech_specs.parquet", columns=["saf_number", "tech_description"]
+            )
             self._logger.info(f"Loaded tech specs: {len(df_specs)} records")
         except FileNotFoundError:
             self._logger.warning("Tech specs not found, continuing without")
             df_specs = pd.DataFrame(columns=["saf_number", "tech_description"])
 
         try:
-            df_permit_license = self._load_step_output("step3_permit_license.parquet")
+            df_permit_license = self._load_step_output(
+                "step3_permit_license.parquet",
+                columns=["saf_number", "permit_text", "license_text"],
+            )
             self._logger.info(f"Loaded permit/license: {len(df_permit_license)} records")
         except FileNotFoundError:
             self._logger.warning("Permit/license not found, continuing without")
@@ -80,22 +209,30 @@ class Step4Classification:
                 df_permit_license[col] = None
         df_permit_license = df_permit_license[permit_cols]
 
-        # Merge on saf_number
-        df = df_base.merge(df_specs, on="saf_number", how="left")
-        df = df.merge(df_permit_license, on="saf_number", how="left")
+        # Merge on saf_number, joining on categorical codes of a shared dtype
+        saf_dtype = df_base["saf_number"].dtype
+        df_base, df_specs, df_permit_license = self._with_shared_saf_categories(
+            df_base, df_specs, df_permit_license
+        )
+        df = df_base
+        for df_right in (df_specs, df_permit_license):
+            if df_right.empty:
+                # Nothing to join, add the columns as nulls like the merge would
+                df = df.assign(**{
+                    col: pd.Series(index=df.index, dtype=df_right[col].dtype)
+                    for col in df_right.columns
+                    if col != "saf_number"
+                })
+            else:
+                df = df.merge(df_right, on="saf_number", how="left")
+        df["saf_number"] = df["saf_number"].astype(saf_dtype)
 
         self._logger.info(f"Merged dataset: {len(df)} records")
 
         # Determine license_need
         self._logger.info("Determining license_need...")
 
-        df["license_need"] = df.apply(
-            lambda row: determine_license_need(
-                row.get("permit_text"),
-                row.get("license_text"),
-            ),
-            axis=1,
-        )
+        df["license_need"] = self._classify(df)
 
         # Statistics
         license_need_counts = df["license_need"].value_counts(dropna=False)
@@ -103,11 +240,8 @@ class Step4Classification:
 
         # Compare with database values
         if "license_need_db" in df.columns and "license_need" in df.columns:
-            df_comparison = df.dropna(subset=["license_need"])
-            if len(df_comparison) > 0:
-                agreement = (
-                    df_comparison["license_need"] == df_comparison["license_need_db"]
-                ).mean()
+            agreement = self._agreement(df["license_need"], df["license_need_db"])
+            if agreement is not None:
                 self._logger.info(f"Agreement with database: {agreement:.2%}")
 
         # Select final columns
@@ -126,10 +260,10 @@ class Step4Classification:
         # Save output
         if output_format == "csv":
             output_path = self._output_dir / "final_dataset.csv"
-            df_final.to_csv(output_path, index=False)
+            self._write_csv(df_final, output_path)
         else:
             output_path = self._output_dir / "final_dataset.parquet"
-            df_final.to_parquet(output_path, index=False)
+            write_parquet(df_final, output_path)
 
         self._logger.info(f"Saved final dataset to {output_path}")
         self._logger.info("Step 4 completed successfully")
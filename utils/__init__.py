@@ -1,14 +1,23 @@
 """Utilities module for logging, progress tracking, and retry logic."""
 
+from .classify_cache import ClassificationCache
+from .download_cache import DownloadCache
+from .json_file import read_json, write_json
+from .parquet import write_parquet
 from .logger import setup_logger, get_logger
 from .progress import ProgressTracker, StateManager
 from .retry import retry, retry_async
 
 __all__ = [
+    "ClassificationCache",
+    "DownloadCache",
     "setup_logger",
     "get_logger",
     "ProgressTracker",
     "StateManager",
     "retry",
     "retry_async",
+    "read_json",
+    "write_json",
+    "write_parquet",
 ]
@@ -0,0 +1,135 @@
+"""Persistent cache of license_need verdicts keyed by text content hash."""
+
+import hashlib
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Optional
+
+from config.patterns import (
+    _LICENSE_NOT_REQUIRED_LITERALS,
+    _LICENSE_NOT_REQUIRED_RE,
+    _LICENSE_REQUIRED_LITERALS,
+    _LICENSE_REQUIRED_RE,
+    CLASSIFIER_VERSION,
+    SOURCE_PRIORITY,
+)
+from config.settings import settings
+
+# SQLite default limit for bound parameters is 999
+_QUERY_CHUNK_SIZE = 500
+
+
+def _patterns_fingerprint() -> bytes:
+    """
+    Digest of the classification rules; changing them invalidates cached verdicts.
+
+    Covers the compiled regexes (after whitespace rewriting), the prescan
+    literals, the source priority and CLASSIFIER_VERSION, which must be
+    bumped whenever the matching code itself changes.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(CLASSIFIER_VERSION.to_bytes(4, "little"))
+    for group in (
+        (_LICENSE_REQUIRED_RE.pattern,),
+        (_LICENSE_NOT_REQUIRED_RE.pattern,),
+        _LICENSE_REQUIRED_LITERALS,
+        _LICENSE_NOT_REQUIRED_LITERALS,
+        SOURCE_PRIORITY,
+    ):
+        for item in group:
+            h.update(item.encode("utf-8"))
+            h.update(b"\x00")
+        h.update(b"\x01")
+    return h.digest()
+
+
+_PATTERNS_FINGERPRINT = _patterns_fingerprint()
+
+
+class ClassificationCache:
+    """SQLite-backed cache of determine_license_need results."""
+
+    def __init__(self, state_dir: Optional[Path] = None):
+        self._state_dir = state_dir or settings.paths.state_dir
+        self._db_path = self._state_dir / "classify_cache.sqlite"
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    @staticmethod
+    def make_key(permit_text: Any, license_text: Any) -> str:
+        """
+        Build cache key from text contents.
+
+        Args:
+            permit_text: Text from permit/ documents (None/NaN allowed)
+            license_text: Text from license/ documents (None/NaN allowed)
+
+        Returns:
+            Hex digest of the texts and the current patterns
+        """
+        h = hashlib.blake2b(_PATTERNS_FINGERPRINT, digest_size=16)
+        for text in (permit_text, license_text):
+            if isinstance(text, str) and text:
+                data = text.encode("utf-8")
+                h.update(b"\x01")
+                h.update(len(data).to_bytes(8, "little"))
+                h.update(data)
+            else:
+                h.update(b"\x00")
+        return h.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        self._state_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, verdict INTEGER)"
+        )
+        return conn
+
+    def get_many(self, keys: list[str]) -> dict[str, Optional[bool]]:
+        """
+        Look up cached verdicts.
+
+        Args:
+            keys: Cache keys from make_key
+
+        Returns:
+            Mapping of found keys to verdicts (missing keys are omitted)
+        """
+        found: dict[str, Optional[bool]] = {}
+        if not keys:
+            return found
+        with closing(self._connect()) as conn:
+            for start in range(0, len(keys), _QUERY_CHUNK_SIZE):
+                chunk = keys[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, verdict FROM verdicts WHERE key IN ({placeholders})",
+                    chunk,
+                )
+                for key, verdict in rows:
+                    found[key] = None if verdict is None else bool(verdict)
+        return found
+
+    def put_many(self, verdicts: dict[str, Optional[bool]]) -> None:
+        """Store verdicts for the given keys."""
+        if not verdicts:
+            return
+        rows = [
+            (key, None if verdict is None else int(verdict))
+            for key, verdict in verdicts.items()
+        ]
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO verdicts (key, verdict) VALUES (?, ?)",
+                    rows,
+                )
+
+    def delete(self) -> None:
+        """Delete cache file."""
+        if self._db_path.exists():
+            self._db_path.unlink()
@@ -0,0 +1,113 @@
+"""Local on-disk cache of downloaded MinIO objects."""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from config.settings import settings
+
+# Eviction trims the cache to this share of the limit, so it doesn't rerun on every put
+_EVICT_TARGET_RATIO = 0.9
+
+
+class DownloadCache:
+    """
+    File cache keyed by (bucket, object name, ETag).
+
+    A changed object gets a new ETag and therefore a new entry; stale
+    entries age out through LRU eviction once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self._cache_dir = cache_dir or settings.paths.cache_dir
+        self._max_bytes = settings.minio.cache_max_bytes if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self._evicting = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    def _path(self, bucket: str, object_name: str, etag: str) -> Path:
+        digest = hashlib.sha1(f"{bucket}/{object_name}".encode("utf-8")).hexdigest()
+        return self._cache_dir / f"{digest}_{etag}"
+
+    def get(self, bucket: str, object_name: str, etag: str) -> Optional[bytes]:
+        """
+        Read a cached object.
+
+        Args:
+            bucket: Bucket name
+            object_name: Full object path in bucket
+            etag: Current ETag of the object
+
+        Returns:
+            Cached contents, or None if not cached
+        """
+        path = self._path(bucket, object_name, etag)
+        try:
+            data = path.read_bytes()
+            # Mark as recently used for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, bucket: str, object_name: str, etag: str, data: bytes) -> None:
+        """Store object contents, evicting old entries in the background if over the limit."""
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(bucket, object_name, etag))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += len(data)
+            if self._size <= self._max_bytes or self._evicting:
+                return
+            self._evicting = True
+        threading.Thread(target=self._evict, name="download-cache-evict", daemon=True).start()
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        """List cache entries as (mtime, size, path)."""
+        entries = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.name.endswith(".tmp") or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is below the target size."""
+        try:
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            target = self._max_bytes * _EVICT_TARGET_RATIO
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                total -= size
+        finally:
+            with self._lock:
+                # Recount on next put; entries may have been added meanwhile
+                self._size = None
+                self._evicting = False
@@ -0,0 +1,38 @@
+"""Fast JSON file reading and writing with orjson."""
+
+import mmap
+import os
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+
+def read_json(path: Path) -> Any:
+    """
+    Parse a JSON file from a memory-mapped view.
+
+    Args:
+        path: Path to JSON file
+
+    Returns:
+        Parsed JSON data
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file; let orjson raise the decode error
+            return orjson.loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """
+    Write data as indented UTF-8 JSON.
+
+    Args:
+        path: Path to JSON file
+        data: JSON-serializable data
+    """
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
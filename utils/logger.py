@@ -1,13 +1,204 @@
 """Logging configuration."""
 
+import atexit
 import logging
+import os
+import queue
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, time as dt_time, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 
 from config.settings import settings
 
+# Write buffer of log files; flushed when full or whenever the log queue drains
+_FILE_BUFFER_SIZE = 65536
+
+_LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class _CachingFormatter(logging.Formatter):
+    """
+    Formatter that formats the timestamp once per second and each
+    record once, however many handlers it reaches.
+    """
+
+    def __init__(self, fmt: str, datefmt: str):
+        super().__init__(fmt, datefmt=datefmt)
+        # (second, formatted time), replaced as a whole so threads can share it
+        self._cached_time: tuple[int, str] = (-1, "")
+
+    def format(self, record: logging.LogRecord) -> str:
+        # Result is stored on the record together with the formatter that produced it
+        cached = record.__dict__.get("_formatted")
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        formatted = super().format(record)
+        record._formatted = (self, formatted)
+        return formatted
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        second = int(record.created)
+        cached_second, formatted = self._cached_time
+        if second != cached_second:
+            formatted = time.strftime(self.datefmt, self.converter(second))
+            self._cached_time = (second, formatted)
+        return formatted
+
+
+class _AppendFileHandler(logging.Handler):
+    """
+    Log file handler writing buffered UTF-8 bytes with os.write.
+
+    Only the background log writer thread emits to it, so records are
+    handled without taking the handler lock.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.baseFilename = os.fspath(path)
+        self._fd: Optional[int] = os.open(
+            self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+        )
+        self._buffer = bytearray()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if not self.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            formatted = self.format(record)
+            # Log files sharing the formatter also share the encoded line
+            cached = record.__dict__.get("_encoded")
+            if cached is not None and cached[0] is formatted:
+                line = cached[1]
+            else:
+                line = (formatted + "\n").encode("utf-8")
+                record._encoded = (formatted, line)
+            self._buffer += line
+            if len(self._buffer) >= _FILE_BUFFER_SIZE:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        if self._buffer and self._fd is not None:
+            view = memoryview(self._buffer)
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+            view.release()
+            self._buffer.clear()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        finally:
+            super().close()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.baseFilename} ({logging.getLevelName(self.level)})>"
+
+
+class _ThreadQueueHandler(QueueHandler):
+    """Queue handler for an in-process queue: records are passed without copying or pre-formatting."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _LogFileWriter(QueueListener):
+    """
+    Background writer for all log files.
+
+    Records from the shared queue are routed to the file handlers of
+    their logger; buffers are flushed each time the queue drains, so a
+    burst of records costs one write per file.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        # logger name -> file handlers; replaced, not mutated, on updates
+        self.routes: dict[str, tuple[logging.Handler, ...]] = {}
+
+    def set_handlers(self, name: str, handlers: tuple[logging.Handler, ...]) -> None:
+        routes = dict(self.routes)
+        routes.pop(name, None)
+        if handlers:
+            routes[name] = handlers
+        self.routes = routes
+
+    def add_handler(self, name: str, handler: logging.Handler) -> None:
+        handlers = self.routes.get(name, ())
+        if handler not in handlers:
+            self.set_handlers(name, handlers + (handler,))
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        if self.queue.empty():
+            for handlers in self.routes.values():
+                for handler in handlers:
+                    handler.flush()
+
+
+# Shared by all handlers so the cached timestamp is reused across loggers
+_formatter = _CachingFormatter(_LOG_FORMAT, datefmt=_DATE_FORMAT)
+
+_log_queue: queue.Queue = queue.Queue(-1)
+_listener: Optional[_LogFileWriter] = None
+# One handler per log file, shared by all loggers writing to it
+_file_handlers: dict[Path, logging.Handler] = {}
+# (expiry timestamp, date string) of log file names; valid until local midnight
+_date_cache: tuple[float, str] = (0.0, "")
+# Arguments each logger was last configured with by setup_logger
+_logger_config: dict[str, tuple[Optional[str], int, bool]] = {}
+
+
+def _get_listener() -> _LogFileWriter:
+    """Start the background log writer on first use."""
+    global _listener
+    if _listener is None:
+        _listener = _LogFileWriter(_log_queue)
+        _listener.start()
+        atexit.register(_listener.stop)
+    return _listener
+
+
+def _get_file_handler(path: Path, level: int) -> logging.Handler:
+    """Get the shared buffered handler for a log file."""
+    handler = _file_handlers.get(path)
+    if handler is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = _AppendFileHandler(path)
+        _file_handlers[path] = handler
+    handler.setLevel(level)
+    handler.setFormatter(_formatter)
+    return handler
+
+
+def _today() -> str:
+    """Date part of log file names, recomputed only after local midnight."""
+    global _date_cache
+    now = time.time()
+    expires, date_str = _date_cache
+    if now >= expires:
+        today = datetime.fromtimestamp(now).date()
+        date_str = today.strftime("%Y-%m-%d")
+        expires = datetime.combine(today + timedelta(days=1), dt_time.min).timestamp()
+        _date_cache = (expires, date_str)
+    return date_str
+
 
 def setup_logger(
     name: str,
@@ -18,6 +209,10 @@ def setup_logger(
     """
     Set up a logger with file and/or console handlers.
 
+    File output goes through a queue to a background writer thread,
+    so logging calls do not wait on file I/O.
+    Repeated calls with the same arguments return the logger unchanged.
+
     Args:
         name: Logger name
         log_file: Log file name (will be placed in logs directory)
@@ -28,37 +223,35 @@ def setup_logger(
         Configured logger
     """
     logger = logging.getLogger(name)
+    config = (log_file, level, include_console)
+    if _logger_config.get(name) == config:
+        # Already configured the same way, keep existing handlers
+        return logger
+
     logger.setLevel(level)
 
     # Clear existing handlers
     logger.handlers.clear()
-
-    # Format
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if _listener is not None:
+        _listener.set_handlers(name, ())
 
     # File handler
     if log_file:
-        logs_dir = settings.paths.logs_dir
-        logs_dir.mkdir(parents=True, exist_ok=True)
+        file_handler = _get_file_handler(settings.paths.logs_dir / log_file, level)
+        _get_listener().set_handlers(name, (file_handler,))
 
-        file_handler = logging.FileHandler(
-            logs_dir / log_file,
-            encoding="utf-8",
-        )
-        file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        queue_handler = _ThreadQueueHandler(_log_queue)
+        queue_handler.setLevel(level)
+        logger.addHandler(queue_handler)
 
     # Console handler
     if include_console:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(level)
-        console_handler.setFormatter(formatter)
+        console_handler.setFormatter(_formatter)
         logger.addHandler(console_handler)
 
+    _logger_config[name] = config
     return logger
 
 
@@ -71,7 +264,8 @@ def get_step_logger(step_name: str) -> logging.Logger:
     """
     Get logger for a pipeline step.
 
-    Creates loggers for both step-specific and error logs.
+    Records go to the step log; errors are also written to the shared
+    errors log by the same background writer.
 
     Args:
         step_name: Name of the pipeline step
@@ -79,7 +273,7 @@ def get_step_logger(step_name: str) -> logging.Logger:
     Returns:
         Step logger
     """
-    date_str = datetime.now().strftime("%Y-%m-%d")
+    date_str = _today()
 
     # Main step logger
     logger = setup_logger(
@@ -88,20 +282,19 @@ def get_step_logger(step_name: str) -> logging.Logger:
         level=logging.INFO,
     )
 
-    # Error logger
-    error_logger = setup_logger(
-        f"{step_name}_errors",
-        log_file=f"errors_{date_str}.log",
-        level=logging.ERROR,
-        include_console=False,
+    # Error log, shared by all steps
+    error_handler = _get_file_handler(
+        settings.paths.logs_dir / f"errors_{date_str}.log",
+        logging.ERROR,
     )
+    _get_listener().add_handler(step_name, error_handler)
 
     return logger
 
 
 def get_pipeline_logger() -> logging.Logger:
     """Get main pipeline logger."""
-    date_str = datetime.now().strftime("%Y-%m-%d")
+    date_str = _today()
     return setup_logger(
         "pipeline",
         log_file=f"pipeline_{date_str}.log",
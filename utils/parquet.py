@@ -0,0 +1,34 @@
+"""Parquet writing with shared compression settings."""
+
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# zstd at a low level compresses the long text columns much better than
+# snappy while decompressing at least as fast
+_COMPRESSION = "zstd"
+_COMPRESSION_LEVEL = 3
+_DATA_PAGE_SIZE = 1 << 20
+
+
+def write_parquet(data: Union[pd.DataFrame, pa.Table], path: Path) -> None:
+    """
+    Write a DataFrame or Arrow table to a parquet file.
+
+    Args:
+        data: Data to write (DataFrame index is not stored)
+        path: Output file path
+    """
+    if isinstance(data, pd.DataFrame):
+        data = pa.Table.from_pandas(data, preserve_index=False)
+    pq.write_table(
+        data,
+        path,
+        compression=_COMPRESSION,
+        compression_level=_COMPRESSION_LEVEL,
+        use_dictionary=True,
+        data_page_size=_DATA_PAGE_SIZE,
+    )
@@ -1,45 +1,318 @@
 """Progress tracking and state management."""
 
-import json
+import atexit
+import copy
+import mmap
+import os
+import queue
+import struct
+import sys
+import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
+
+import orjson
+import ormsgpack
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeRemainingColumn
 
 from config.settings import settings
+from utils.json_file import read_json
+from utils.logger import get_pipeline_logger
+
+# Number of state events after which save() rewrites the full snapshot
+# instead of appending to the delta log
+_SNAPSHOT_INTERVAL = 500
+
+# Snapshot file header: magic and format version, followed by a msgpack payload
+_STATE_MAGIC = b"SAF1"
+_STATE_VERSION = 1
+_STATE_HEADER = struct.Struct("<4sI")
+
+# Progress bar repaint rate and how often coalesced advance() calls are applied
+_PROGRESS_REFRESH_PER_SECOND = 4
+_PROGRESS_PUMP_INTERVAL = 0.05
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write the whole buffer to a file descriptor and fsync it."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+    os.fsync(fd)
+
+
+def _read_snapshot(path: Path) -> dict[str, Any]:
+    """Read a binary state snapshot from a memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _STATE_HEADER.size:
+            raise ValueError(f"Truncated state file: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            magic, version = _STATE_HEADER.unpack_from(view)
+            if magic != _STATE_MAGIC:
+                raise ValueError(f"Not a state file: {path}")
+            if version != _STATE_VERSION:
+                raise ValueError(f"Unsupported state format version {version}: {path}")
+            with view[_STATE_HEADER.size:] as payload:
+                return ormsgpack.unpackb(payload)
 
 
 class StateManager:
-    """Manage pipeline state for resume capability."""
+    """
+    Manage pipeline state for resume capability.
+
+    State changes are recorded as events. save() appends the events since
+    the previous save to a delta log and rewrites the full snapshot only
+    every _SNAPSHOT_INTERVAL events; load() replays the delta log on top
+    of the snapshot.
+    """
 
     def __init__(self, step_name: str, state_dir: Optional[Path] = None):
         self._step_name = step_name
         self._state_dir = state_dir or settings.paths.state_dir
-        self._state_file = self._state_dir / f"{step_name}_progress.json"
+        self._state_file = self._state_dir / f"{step_name}_progress.bin"
+        # Pretty JSON snapshot written by earlier versions; read if no binary one exists
+        self._legacy_state_file = self._state_dir / f"{step_name}_progress.json"
+        self._delta_file = self._state_dir / f"{step_name}_progress.delta.jsonl"
         self._state: dict[str, Any] = {}
+        # Mirror of processed_saf_numbers for O(1) membership checks
+        self._processed_set: set[str] = set()
+        # processed_files as sets, built on first new-files check
+        self._processed_files_sets: Optional[dict[str, set[str]]] = None
+        # Encoded events not yet passed to the writer
+        self._pending_events: list[bytes] = []
+        self._events_since_snapshot = 0
+        # Snapshots and delta batches queued by save() and written by a background thread
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._write_error: Optional[BaseException] = None
 
     @property
     def state_file(self) -> Path:
         return self._state_file
 
+    @property
+    def delta_file(self) -> Path:
+        return self._delta_file
+
     def _ensure_dir(self) -> None:
         self._state_dir.mkdir(parents=True, exist_ok=True)
 
     def load(self) -> dict[str, Any]:
-        """Load state from file."""
+        """Load state from the snapshot file and replay the delta log."""
+        self.flush()
         if self._state_file.exists():
-            with open(self._state_file, "r", encoding="utf-8") as f:
-                self._state = json.load(f)
+            self._state = _read_snapshot(self._state_file)
+        elif self._legacy_state_file.exists():
+            self._state = read_json(self._legacy_state_file)
         else:
             self._state = self._create_initial_state()
+        self._processed_set = set(self._state.get("processed_saf_numbers", []))
+        self._processed_files_sets = None
+        self._pending_events.clear()
+        replayed, damaged = self._replay_delta()
+        # Compact the replayed events into the snapshot on the next save.
+        # A damaged log must not be appended to: a new record could be
+        # glued onto a torn or bad line and lost with it
+        self._events_since_snapshot = _SNAPSHOT_INTERVAL if replayed or damaged else 0
         return self._state
 
+    def _replay_delta(self) -> tuple[int, bool]:
+        """
+        Apply events from the delta log to the loaded state.
+
+        Returns:
+            Tuple of (replayed_events, damaged), where damaged means a
+            record was skipped or the log ends in a torn line
+        """
+        if not self._delta_file.exists():
+            return 0, False
+        replayed = 0
+        damaged = False
+        with open(self._delta_file, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return 0, False
+            # Scan line boundaries in the mapped file, parsing each line from a view
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                pos = 0
+                while pos < size:
+                    end = mm.find(b"\n", pos)
+                    if end == -1:
+                        # Torn last line from an interrupted write
+                        get_pipeline_logger().warning(
+                            f"Ignoring torn record at byte {pos} of {self._delta_file}"
+                        )
+                        damaged = True
+                        break
+                    try:
+                        with view[pos:end] as line:
+                            event = orjson.loads(line)
+                        self._apply(event)
+                        replayed += 1
+                    except (ValueError, KeyError, TypeError) as e:
+                        # Keep replaying; the log is rewritten on the next save
+                        get_pipeline_logger().warning(
+                            f"Skipping bad record at byte {pos} of {self._delta_file}: {e}"
+                        )
+                        damaged = True
+                    pos = end + 1
+        return replayed, damaged
+
     def save(self) -> None:
-        """Save state to file."""
+        """
+        Queue the state changes since the last save for writing.
+
+        Returns immediately; files are written by a background thread.
+        Call flush() to wait until they are on disk. Does nothing if
+        the state has not changed since the last save.
+        """
+        if not self._pending_events:
+            return
+        self._record({"op": "updated", "at": datetime.now().isoformat()})
+        if self._events_since_snapshot >= _SNAPSHOT_INTERVAL:
+            self._queue_snapshot()
+        else:
+            self._enqueue("delta", b"".join(self._pending_events))
+            self._pending_events.clear()
+
+    def flush(self) -> None:
+        """
+        Wait until all saved state is written to disk.
+
+        Saved events still in the delta log are compacted into the snapshot first.
+        """
+        if self._events_since_snapshot and not self._pending_events:
+            self._queue_snapshot()
+        if self._writer is not None:
+            self._queue.join()
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
+
+    def close(self) -> None:
+        """Flush saved state and stop the background writer."""
+        try:
+            self.flush()
+        finally:
+            if self._writer is not None:
+                self._queue.put(None)
+                self._writer.join()
+                self._writer = None
+                atexit.unregister(self._queue.join)
+
+    def _queue_snapshot(self) -> None:
+        """Queue a full snapshot; it supersedes the delta log."""
+        self._pending_events.clear()
+        self._events_since_snapshot = 0
+        self._enqueue("snapshot", copy.deepcopy(self._state))
+
+    def _enqueue(self, kind: str, payload: Any) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_loop,
+                name=f"{self._step_name}-state-writer",
+                daemon=True,
+            )
+            self._writer.start()
+            atexit.register(self._queue.join)
+        self._queue.put((kind, payload))
+
+    def _write_loop(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while items[-1] is not None:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # None is queued last by close() to stop the thread
+            stop = items[-1] is None
+            if stop:
+                items.pop()
+                self._queue.task_done()
+            try:
+                # A snapshot covers everything queued before it
+                snapshots = [i for i, (kind, _) in enumerate(items) if kind == "snapshot"]
+                deltas = items
+                if snapshots:
+                    self._write(items[snapshots[-1]][1])
+                    self._delta_file.unlink(missing_ok=True)
+                    deltas = items[snapshots[-1] + 1:]
+                data = b"".join(payload for _, payload in deltas)
+                if data:
+                    self._append(data)
+            except BaseException as e:
+                self._write_error = e
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, state: dict[str, Any]) -> None:
+        """Write state atomically and durably via a temp file in the same directory."""
+        self._ensure_dir()
+        payload = _STATE_HEADER.pack(_STATE_MAGIC, _STATE_VERSION) + ormsgpack.packb(
+            state, option=ormsgpack.OPT_NON_STR_KEYS
+        )
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self._state_dir, prefix=f".{self._state_file.name}.", suffix=".tmp"
+        )
+        try:
+            try:
+                _write_all(fd, payload)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, self._state_file)
+            self._legacy_state_file.unlink(missing_ok=True)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def _append(self, data: bytes) -> None:
+        """Append encoded events to the delta log."""
         self._ensure_dir()
-        self._state["updated_at"] = datetime.now().isoformat()
-        with open(self._state_file, "w", encoding="utf-8") as f:
-            json.dump(self._state, f, ensure_ascii=False, indent=2)
+        fd = os.open(self._delta_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
+
+    def _record(self, event: dict[str, Any]) -> None:
+        """Apply a state event and keep it for the delta log."""
+        self._apply(event)
+        self._pending_events.append(orjson.dumps(event) + b"\n")
+        self._events_since_snapshot += 1
+
+    def _apply(self, event: dict[str, Any]) -> None:
+        """Apply a state event to the in-memory state."""
+        op = event["op"]
+        if op == "processed":
+            if event["saf"] not in self._processed_set:
+                self._processed_set.add(event["saf"])
+                self._state["processed_saf_numbers"].append(event["saf"])
+                self._state["processed_items"] += 1
+        elif op == "failed":
+            self._state["failed_saf_numbers"][event["saf"]] = event["error"]
+            self._state["failed_items"] = len(self._state["failed_saf_numbers"])
+        elif op == "files":
+            if "processed_files" not in self._state:
+                self._state["processed_files"] = {}
+            # Copy, so later changes to the caller's list do not leak into the state
+            self._state["processed_files"][event["saf"]] = list(event["files"])
+            if self._processed_files_sets is not None:
+                self._processed_files_sets[event["saf"]] = set(event["files"])
+        elif op == "total":
+            self._state["total_items"] = event["value"]
+        elif op == "batch":
+            self._state["current_batch"] = event["value"]
+        elif op == "updated":
+            self._state["updated_at"] = event["at"]
+        else:
+            raise ValueError(f"Unknown state event: {op!r}")
 
     def _create_initial_state(self) -> dict[str, Any]:
         """Create initial state structure."""
@@ -57,8 +330,8 @@ class StateManager:
         }
 
     def get_processed(self) -> set[str]:
-        """Get set of processed SAF numbers."""
-        return set(self._state.get("processed_saf_numbers", []))
+        """Get set of processed SAF numbers (live view, do not modify)."""
+        return self._processed_set
 
     def get_failed(self) -> dict[str, str]:
         """Get dict of failed SAF numbers with error messages."""
@@ -66,20 +339,20 @@ class StateManager:
 
     def mark_processed(self, saf_number: str) -> None:
         """Mark SAF number as processed."""
-        if saf_number not in self._state["processed_saf_numbers"]:
-            self._state["processed_saf_numbers"].append(saf_number)
-            self._state["processed_items"] = len(self._state["processed_saf_numbers"])
+        if saf_number not in self._processed_set:
+            self._record({"op": "processed", "saf": saf_number})
 
     def mark_failed(self, saf_number: str, error: str) -> None:
         """Mark SAF number as failed with error message."""
-        self._state["failed_saf_numbers"][saf_number] = error
-        self._state["failed_items"] = len(self._state["failed_saf_numbers"])
+        if self._state["failed_saf_numbers"].get(saf_number) == error:
+            return
+        self._record({"op": "failed", "saf": saf_number, "error": error})
 
     def mark_files_processed(self, saf_number: str, files: list[str]) -> None:
         """Mark specific files as processed for a SAF number."""
-        if "processed_files" not in self._state:
-            self._state["processed_files"] = {}
-        self._state["processed_files"][saf_number] = files
+        if self._state.get("processed_files", {}).get(saf_number) == files:
+            return
+        self._record({"op": "files", "saf": saf_number, "files": files})
 
     def get_processed_files(self, saf_number: str) -> list[str]:
         """Get list of processed files for a SAF number."""
@@ -99,48 +372,60 @@ class StateManager:
         Returns:
             List of SAF numbers that need processing (new or have new files)
         """
-        processed_files = self.get_all_processed_files()
-        need_processing = []
+        if self._processed_files_sets is None:
+            self._processed_files_sets = {
+                saf_number: set(files)
+                for saf_number, files in self._state.get("processed_files", {}).items()
+            }
+        processed_sets = self._processed_files_sets
 
+        need_processing = []
         for saf_number, files in current_mapping.items():
-            if saf_number not in processed_files:
-                # New SAF number
+            old_files = processed_sets.get(saf_number)
+            # New SAF number or has new files
+            if old_files is None or not old_files.issuperset(files):
                 need_processing.append(saf_number)
-            else:
-                # Check if there are new files
-                old_files = set(processed_files[saf_number])
-                new_files = set(files)
-                if new_files - old_files:
-                    # Has new files
-                    need_processing.append(saf_number)
 
         return need_processing
 
     def set_total(self, total: int) -> None:
         """Set total number of items."""
-        self._state["total_items"] = total
+        if self._state.get("total_items") == total:
+            return
+        self._record({"op": "total", "value": total})
 
     def update_batch(self, batch_num: int) -> None:
         """Update current batch number."""
-        self._state["current_batch"] = batch_num
+        if self._state.get("current_batch") == batch_num:
+            return
+        self._record({"op": "batch", "value": batch_num})
 
     def reset(self) -> None:
         """Reset state to initial."""
         self._state = self._create_initial_state()
-        self.save()
+        self._processed_set = set()
+        self._processed_files_sets = None
+        self._queue_snapshot()
 
     def exists(self) -> bool:
-        """Check if state file exists."""
-        return self._state_file.exists()
+        """Check if a state snapshot (binary or legacy JSON) exists on disk."""
+        return self._state_file.exists() or self._legacy_state_file.exists()
 
     def delete(self) -> None:
-        """Delete state file."""
-        if self._state_file.exists():
-            self._state_file.unlink()
+        """Delete state file and delta log."""
+        self.flush()
+        self._state_file.unlink(missing_ok=True)
+        self._legacy_state_file.unlink(missing_ok=True)
+        self._delta_file.unlink(missing_ok=True)
 
 
 class ProgressTracker:
-    """Track and display progress with rich library."""
+    """
+    Track and display progress with rich library.
+
+    Without a terminal (or with NO_PROGRESS set) nothing is displayed;
+    progress is only counted and logged once on exit.
+    """
 
     def __init__(
         self,
@@ -153,17 +438,34 @@ class ProgressTracker:
         self._state_manager = state_manager
         self._progress: Optional[Progress] = None
         self._task_id = None
+        # advance() only adds to a counter; a pump thread applies it periodically
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stop_pump = threading.Event()
+        self._pump: Optional[threading.Thread] = None
+        self._enabled = False
+        # Progress counted in headless mode
+        self._completed = 0
 
     def __enter__(self):
+        self._enabled = settings.show_progress and sys.stdout.isatty()
+        if not self._enabled:
+            self._completed = len(self._state_manager.get_processed()) if self._state_manager else 0
+            return self
+
         self._progress = Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             TaskProgressColumn(),
             TimeRemainingColumn(),
+            refresh_per_second=_PROGRESS_REFRESH_PER_SECOND,
         )
         self._progress.start()
         self._task_id = self._progress.add_task(self._description, total=self._total)
+        self._stop_pump.clear()
+        self._pump = threading.Thread(target=self._pump_loop, name="progress-pump", daemon=True)
+        self._pump.start()
 
         # Resume from state if available
         if self._state_manager:
@@ -174,20 +476,50 @@ class ProgressTracker:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self._enabled:
+            get_pipeline_logger().info(f"{self._description}: processed {self._completed}/{self._total}")
+            return
+        if self._pump is not None:
+            self._stop_pump.set()
+            self._pump.join()
+            self._pump = None
+        self._apply_pending()
         if self._progress:
             self._progress.stop()
 
+    def _pump_loop(self) -> None:
+        while not self._stop_pump.wait(_PROGRESS_PUMP_INTERVAL):
+            self._apply_pending()
+
+    def _apply_pending(self) -> None:
+        """Apply coalesced advance() calls in one update."""
+        with self._lock:
+            amount, self._pending = self._pending, 0
+        if amount and self._progress and self._task_id is not None:
+            self._progress.advance(self._task_id, amount)
+
     def advance(self, amount: int = 1) -> None:
         """Advance progress by amount."""
-        if self._progress and self._task_id is not None:
-            self._progress.advance(self._task_id, amount)
+        if not self._enabled:
+            self._completed += amount
+            return
+        with self._lock:
+            self._pending += amount
 
     def update(self, completed: int) -> None:
         """Set progress to specific value."""
+        if not self._enabled:
+            self._completed = completed
+            return
         if self._progress and self._task_id is not None:
+            with self._lock:
+                self._pending = 0
             self._progress.update(self._task_id, completed=completed)
 
     def set_description(self, description: str) -> None:
         """Update progress description."""
+        if not self._enabled:
+            self._description = description
+            return
         if self._progress and self._task_id is not None:
             self._progress.update(self._task_id, description=description)
@@ -2,8 +2,42 @@
 
 import asyncio
 import functools
+import random
+import threading
 import time
-from typing import Callable, Type, Union
+from typing import Callable, Optional, Type, Union
+
+
+def _next_delay(
+    previous: float,
+    delay: float,
+    backoff: float,
+    cap: float,
+    jitter: bool,
+) -> float:
+    """
+    Compute the next sleep between attempts.
+
+    With jitter, uses decorrelated jitter: a random delay between the
+    initial delay and backoff times the previous one, so concurrent
+    callers do not retry in lockstep.
+    """
+    if jitter:
+        upper = max(delay, previous * backoff)
+        return min(cap, random.uniform(delay, upper))
+    return min(cap, previous * backoff)
+
+
+def _first_delay(delay: float, backoff: float, cap: float, jitter: bool) -> float:
+    """
+    Compute the sleep before the first retry.
+
+    With jitter, it is drawn from the same range as later delays, so callers
+    that failed together do not all retry after exactly the initial delay.
+    """
+    if jitter:
+        return _next_delay(delay, delay, backoff, cap, jitter)
+    return min(cap, delay)
 
 
 def retry(
@@ -11,6 +45,11 @@ def retry(
     delay: float = 5,
     backoff: float = 2,
     exceptions: tuple[Type[Exception], ...] = (Exception,),
+    jitter: bool = False,
+    cap: float = 60.0,
+    cancel_event: Optional[threading.Event] = None,
+    giveup: Optional[Callable[[Exception], bool]] = None,
+    max_elapsed: Optional[float] = None,
 ) -> Callable:
     """
     Retry decorator for synchronous functions.
@@ -20,26 +59,50 @@ def retry(
         delay: Initial delay between retries in seconds
         backoff: Multiplier for delay after each retry
         exceptions: Tuple of exception types to catch
+        jitter: Randomize delays (decorrelated jitter)
+        cap: Maximum delay between retries in seconds
+        cancel_event: Stops waiting and further retries when set
+        giveup: Predicate for permanent errors, re-raised without retrying
+        max_elapsed: Total time budget in seconds, measured with
+            time.monotonic() from the first attempt; no retry is started
+            if its delay would end past the budget
 
     Returns:
         Decorated function
     """
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            current_delay = delay
-            last_exception = None
-
-            for attempt in range(max_attempts):
+        if max_attempts <= 1:
+            # Nothing to retry, leave the function as is
+            return func
+
+        def retry_after(error: Exception, deadline: Optional[float], args: tuple, kwargs: dict):
+            current_delay = _first_delay(delay, backoff, cap, jitter)
+            for _ in range(max_attempts - 1):
+                if giveup is not None and giveup(error):
+                    raise error
+                if deadline is not None and time.monotonic() + current_delay > deadline:
+                    raise error
+                if cancel_event is not None:
+                    if cancel_event.wait(current_delay):
+                        raise error
+                else:
+                    time.sleep(current_delay)
+                current_delay = _next_delay(current_delay, delay, backoff, cap, jitter)
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    last_exception = e
-                    if attempt < max_attempts - 1:
-                        time.sleep(current_delay)
-                        current_delay *= backoff
+                    error = e
+            raise error
 
-            raise last_exception
+        # First attempt is a plain call; the retry loop only runs after a failure
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            deadline = None if max_elapsed is None else time.monotonic() + max_elapsed
+            try:
+                return func(*args, **kwargs)
+            except exceptions as e:
+                error = e
+            return retry_after(error, deadline, args, kwargs)
 
         return wrapper
     return decorator
@@ -50,6 +113,11 @@ def retry_async(
     delay: float = 5,
     backoff: float = 2,
     exceptions: tuple[Type[Exception], ...] = (Exception,),
+    jitter: bool = False,
+    cap: float = 60.0,
+    cancel_event: Optional[asyncio.Event] = None,
+    giveup: Optional[Callable[[Exception], bool]] = None,
+    max_elapsed: Optional[float] = None,
 ) -> Callable:
     """
     Retry decorator for async functions.
@@ -59,26 +127,54 @@ def retry_async(
         delay: Initial delay between retries in seconds
         backoff: Multiplier for delay after each retry
         exceptions: Tuple of exception types to catch
+        jitter: Randomize delays (decorrelated jitter)
+        cap: Maximum delay between retries in seconds
+        cancel_event: Stops waiting and further retries when set
+        giveup: Predicate for permanent errors, re-raised without retrying
+        max_elapsed: Total time budget in seconds, measured with
+            time.monotonic() from the first attempt; no retry is started
+            if its delay would end past the budget
 
     Returns:
         Decorated function
     """
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            current_delay = delay
-            last_exception = None
-
-            for attempt in range(max_attempts):
+        if max_attempts <= 1:
+            # Nothing to retry, leave the function as is
+            return func
+
+        async def retry_after(error: Exception, deadline: Optional[float], args: tuple, kwargs: dict):
+            current_delay = _first_delay(delay, backoff, cap, jitter)
+            for _ in range(max_attempts - 1):
+                if giveup is not None and giveup(error):
+                    raise error
+                if deadline is not None and time.monotonic() + current_delay > deadline:
+                    raise error
+                if cancel_event is not None:
+                    try:
+                        await asyncio.wait_for(cancel_event.wait(), timeout=current_delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    else:
+                        raise error
+                else:
+                    await asyncio.sleep(current_delay)
+                current_delay = _next_delay(current_delay, delay, backoff, cap, jitter)
                 try:
                     return await func(*args, **kwargs)
                 except exceptions as e:
-                    last_exception = e
-                    if attempt < max_attempts - 1:
-                        await asyncio.sleep(current_delay)
-                        current_delay *= backoff
+                    error = e
+            raise error
 
-            raise last_exception
+        # First attempt is a plain call; the retry loop only runs after a failure
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            deadline = None if max_elapsed is None else time.monotonic() + max_elapsed
+            try:
+                return await func(*args, **kwargs)
+            except exceptions as e:
+                error = e
+            return await retry_after(error, deadline, args, kwargs)
 
         return wrapper
     return decorator